@@ -1,16 +1,27 @@
-import kep
+import os
+from kep.dataframe import columnar
+import kep.utilities.locations as loc
 from pathlib import Path
 from io import StringIO
 import pandas as pd
 
 
-def read_csv(source):
+def read_csv(source, columns=None):
     """Wrapper for pd.read_csv(). Treats first column as time index.
+       Args:
+           columns - list of column names to read, all columns if None
        Returns:
            pd.DataFrame()
     """
-    converter_arg = dict(converters={0: pd.to_datetime}, index_col=0)
-    return pd.read_csv(source, **converter_arg)
+    if columns is None:
+        return pd.read_csv(source, index_col=0, parse_dates=[0])
+    columns = list(columns)
+    # time index column has no name, pandas calls it 'Unnamed: 0'
+    wanted = set(columns + ['Unnamed: 0'])
+    df = pd.read_csv(source, index_col=0, parse_dates=[0],
+                     usecols=lambda name: name in wanted)
+    df.index.name = None
+    return df[columns]
 
 
 def proxy(path):
@@ -25,21 +36,35 @@ def proxy(path):
     return StringIO(content)
 
 
-def read_dataframe(path):
+def read_dataframe(path, columns=None):
     filelike = proxy(path)
-    return read_csv(filelike)
+    return read_csv(filelike, columns)
+
 
+def read_local(csv_path, binary_path, columns=None):
+    """Read columnar binary file memory-mapped if it exists and pyarrow
+       is installed, otherwise read CSV file."""
+    if os.path.exists(binary_path) and columnar.available():
+        return columnar.read_columnar(binary_path, columns)
+    return read_dataframe(csv_path, columns)
 
-def get_dataframe(year, month, freq):
-    """Read processed dataframe from local folder by *year* and *month*."""
-    path = kep.processed_csv(year, month, freq)
-    return read_dataframe(path)
 
+def get_dataframe(year, month, freq, columns=None):
+    """Read processed dataframe from local folder by *year* and *month*.
+       Read only *columns*, if given.
+    """
+    return read_local(loc.processed_csv(year, month, freq),
+                      loc.processed_binary(year, month, freq),
+                      columns)
 
-def get_df_latest(freq):
-    """Read processed dataframe from local *latest* folder."""
-    path = kep.latest_csv(freq)
-    return read_dataframe(path)
+
+def get_df_latest(freq, columns=None):
+    """Read processed dataframe from local *latest* folder.
+       Read only *columns*, if given.
+    """
+    return read_local(loc.latest_csv(freq),
+                      loc.latest_binary(freq),
+                      columns)
 
 
 def get_dataframe_from_web(frequency):
@@ -1,8 +1,37 @@
-from .runner import get_dataframes
-from .commands import download, unpack, convert, save_processed, to_latest, to_excel
-from .utilities.locations import processed_csv, latest_csv
+import importlib
+
+# Public functions import their submodules on first call, so that
+# 'import kep' does not load pandas, YAML parameters or network libraries.
+
+
+def _lazy(module_name: str, name: str):
+    def wrapper(*args, **kwargs):
+        func = getattr(importlib.import_module(module_name), name)
+        return func(*args, **kwargs)
+    wrapper.__name__ = wrapper.__qualname__ = name
+    wrapper.__doc__ = f'See {module_name}.{name}()'
+    return wrapper
+
+
+get_dataframes = _lazy('kep.runner', 'get_dataframes')
+download = _lazy('kep.commands', 'download')
+unpack = _lazy('kep.commands', 'unpack')
+convert = _lazy('kep.commands', 'convert')
+save_processed = _lazy('kep.commands', 'save_processed')
+to_latest = _lazy('kep.commands', 'to_latest')
+to_excel = _lazy('kep.commands', 'to_excel')
+save_all = _lazy('kep.commands', 'save_all')
+download_range = _lazy('kep.commands', 'download_range')
+unpack_range = _lazy('kep.commands', 'unpack_range')
+rebuild = _lazy('kep.commands', 'rebuild')
+update = _lazy('kep.pipeline', 'update')
+update_range = _lazy('kep.pipeline', 'update_range')
+processed_csv = _lazy('kep.utilities.locations', 'processed_csv')
+latest_csv = _lazy('kep.utilities.locations', 'latest_csv')
 
 __all__ = ['download', 'unpack', 'convert',
-           'save_processed', 'to_latest', 'to_excel',
+           'save_processed', 'to_latest', 'to_excel', 'save_all',
+           'download_range', 'unpack_range', 'rebuild',
+           'update', 'update_range',
            'get_dataframes',
            'processed_csv', 'latest_csv']
@@ -0,0 +1,220 @@
+"""Time parsing stages over a fixed set of interim CSV files.
+
+Usage:
+    python -m kep.benchmark --output bench.json
+    python -m kep.benchmark --output new.json --compare bench.json
+    python -m kep.benchmark --filters
+
+Stages are timed separately, each stage gets fresh input from
+the previous stage. Commands are applied with TableIndex, like
+kep.runner does with index saved next to interim CSV file. Results
+are best and median times in seconds over *repeat* runs, summed
+over months.
+"""
+import argparse
+import datetime
+import glob
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from kep.engine.reader import read_csv, is_allowed, split_csv, read_tables
+from kep.engine.parser import parse_units, parse_annotated
+from kep.engine.layout import TableIndex
+from kep.engine.frame import DatapointFrame
+from kep.engine import filters
+from kep.engine.validate import validate
+from kep.dataframe import unpack_dataframes
+from kep.parameters import ParsingParameters, CheckParameters
+from kep.config import DATA_ROOT
+from kep.utilities.locations import interim_csv
+
+__all__ = ['run', 'compare', 'run_filters', 'DATES', 'STAGES']
+
+# fixed months across all years of data, each passes validation
+DATES = [(2009, 4), (2010, 10), (2012, 3), (2013, 12), (2015, 6),
+         (2016, 11), (2017, 6), (2018, 6)]
+
+STAGES = ['read_tables', 'split_csv', 'parse_units', 'build_index',
+          'apply_commands', 'datapoints', 'validate', 'unpack_dataframes']
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def parse_commands(tables, index, common_dicts, segment_dicts, matcher):
+    """Same as kep.engine.parser.parse_tables() after units are parsed,
+       with TableIndex *index* saved next to interim CSV file."""
+    index.annotate(tables, matcher)
+    return parse_annotated(tables, common_dicts, segment_dicts)
+
+
+def run_month(year, month):
+    """Run all stages once for *year*, *month*.
+
+       Returns:
+           dictionary of stage times in seconds
+    """
+    p, c = ParsingParameters, CheckParameters
+    path = interim_csv(year, month)
+    rows = list(filter(is_allowed, read_csv(path)))
+    t = {}
+    t['read_tables'], _ = timed(read_tables, path)
+    t['split_csv'], _ = timed(split_csv, rows)
+    tables = read_tables(path)
+    t['parse_units'], tables = timed(parse_units, tables, p.units_dict)
+    t['build_index'], index = timed(TableIndex.build, tables,
+                                    p.header_matcher)
+    t['apply_commands'], tables = timed(parse_commands, tables, index,
+                                        p.common_dicts, p.segment_dicts,
+                                        p.header_matcher)
+    t['datapoints'], frame = timed(DatapointFrame.from_tables, tables)
+    t['validate'], _ = timed(validate, frame,
+                             c.mandatory_list, c.optional_lists)
+    t['unpack_dataframes'], _ = timed(unpack_dataframes, frame)
+    return t
+
+
+def run(dates=DATES, repeat=5):
+    """Time stages over *dates*, best of *repeat* runs.
+
+       Returns:
+           dictionary with 'meta', 'stages' and 'months' keys
+    """
+    # load parameters before timing
+    ParsingParameters.common_dicts, CheckParameters.mandatory_list
+    runs = [[run_month(year, month) for year, month in dates]
+            for _ in range(repeat)]
+    months = {}
+    for i, (year, month) in enumerate(dates):
+        months[f'{year}-{month:02d}'] = {
+            stage: min(r[i][stage] for r in runs) for stage in STAGES}
+    stages = {}
+    for stage in STAGES:
+        totals = [sum(t[stage] for t in r) for r in runs]
+        stages[stage] = dict(best=min(totals),
+                             median=statistics.median(totals))
+    return dict(meta=meta(dates, repeat), stages=stages, months=months)
+
+
+def all_cells(paths=None):
+    """Return list of all cells in interim CSV files at *paths*,
+       by default every file in data/interim."""
+    if paths is None:
+        pattern = str(DATA_ROOT / 'interim' / '**' / 'tab.csv')
+        paths = sorted(glob.glob(pattern, recursive=True))
+    cells = []
+    for path in paths:
+        for row in read_csv(path):
+            cells.extend(row.split('\t'))
+    return cells
+
+
+def apply(func, cells):
+    result = []
+    for x in cells:
+        try:
+            result.append(func(x))
+        except ValueError:
+            result.append(ValueError)
+    return result
+
+
+def run_filters(cells):
+    """Time cell filters against regex reference versions on *cells*,
+       check results are the same.
+
+       Returns:
+           dictionary like {'clean_year': {'regex': 2.1, 'fast': 0.9}, ...}
+    """
+    pairs = [('clean_year', filters.clean_year_by_regex, filters.clean_year),
+             ('clean_value', filters.clean_value_by_regex,
+              filters.clean_value)]
+    result = {}
+    for name, reference, func in pairs:
+        t_ref, expected = timed(apply, reference, cells)
+        t_new, actual = timed(apply, func, cells)
+        if actual != expected:
+            raise AssertionError(f'{name} differs from reference')
+        result[name] = dict(regex=t_ref, fast=t_new, cells=len(cells))
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                       stderr=subprocess.DEVNULL,
+                                       universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def meta(dates, repeat):
+    return dict(time=datetime.datetime.now().isoformat(timespec='seconds'),
+                commit=git_commit(),
+                python=platform.python_version(),
+                machine=platform.platform(),
+                dates=[f'{year}-{month:02d}' for year, month in dates],
+                repeat=repeat)
+
+
+def compare(old: dict, new: dict, threshold=1.25):
+    """Print stage times of *new* result against *old* result.
+
+       Returns:
+           list of stages slower than *threshold* times
+    """
+    slower = []
+    print(f"{'stage':<20}{'old, ms':>10}{'new, ms':>10}{'ratio':>8}")
+    for stage in STAGES:
+        # results saved before a stage was added
+        if stage not in old['stages']:
+            continue
+        a = old['stages'][stage]['best']
+        b = new['stages'][stage]['best']
+        ratio = b / a if a else float('inf')
+        flag = ''
+        if ratio > threshold:
+            slower.append(stage)
+            flag = '  slower'
+        print(f'{stage:<20}{a * 1000:>10.1f}{b * 1000:>10.1f}'
+              f'{ratio:>8.2f}{flag}')
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='save result to JSON file')
+    parser.add_argument('--compare', help='JSON file with previous result')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='slowdown ratio reported as regression')
+    parser.add_argument('--filters', action='store_true',
+                        help='time cell filters on all interim CSV files')
+    args = parser.parse_args(argv)
+    if args.filters:
+        for name, t in run_filters(all_cells()).items():
+            print(f"{name:<12} {t['cells']} cells: regex {t['regex']:.2f} s, "
+                  f"fast {t['fast']:.2f} s")
+        return 0
+    result = run(DATES, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        return 1 if compare(old, result, args.threshold) else 0
+    for stage, t in result['stages'].items():
+        print(f"{stage:<20}{t['best'] * 1000:>10.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""On-disk cache of parsing results.
+
+Cache key is a hash of interim CSV file content, parsing parameters
+(YAML files) and source code of kep.engine and this module. Cached value is a
+DatapointFrame and a list of (name, unit) labels, stored as arrays.
+Least recently used entries are deleted when cache folder grows over
+size limit.
+"""
+import hashlib
+import os
+from pathlib import Path
+import pickle
+
+from kep.engine.frame import DatapointFrame, as_frame
+from kep.utilities.tempfile import atomic_path
+
+__all__ = ['ParseCache', 'cache_key', 'encode', 'decode']
+
+ENGINE_FOLDER = Path(__file__).parent / 'engine'
+MAX_BYTES = 64 * 1024 * 1024
+# readable by all supported Python versions, cache folder may be shared
+PICKLE_PROTOCOL = 4
+
+
+def file_hash(path) -> str:
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+
+def engine_hash() -> str:
+    """Hash of kep.engine source files, a proxy for engine version.
+       This module is included, it defines format of cached values."""
+    h = hashlib.sha1()
+    for path in [*sorted(ENGINE_FOLDER.glob('*.py')), Path(__file__)]:
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def cache_key(csv_path, parameter_paths) -> str:
+    """Make cache key from content of *csv_path*, content of
+       *parameter_paths* and engine source code."""
+    h = hashlib.sha1()
+    for path in [csv_path, *parameter_paths]:
+        h.update(file_hash(path).encode())
+    h.update(engine_hash().encode())
+    return h.hexdigest()
+
+# -----------------------------------------------------------------------------
+
+
+def encode(datapoints, label_list: list) -> bytes:
+    """Pack *datapoints* and *label_list* to bytes."""
+    frame = as_frame(datapoints)
+    content = dict(labels=label_list,
+                   frame_labels=frame.labels,
+                   arrays=[frame.label_codes, frame.freq_codes,
+                           frame.year, frame.month, frame.value])
+    return pickle.dumps(content, protocol=PICKLE_PROTOCOL)
+
+
+def decode(content: bytes):
+    """Unpack bytes made by encode().
+
+       Returns:
+           tuple of DatapointFrame and label list
+    """
+    x = pickle.loads(content)
+    return DatapointFrame(x['frame_labels'], *x['arrays']), x['labels']
+
+# -----------------------------------------------------------------------------
+
+
+class ParseCache:
+    """Folder with cached parsing results, bounded by *max_bytes*."""
+
+    suffix = '.bin'
+
+    def __init__(self, folder, max_bytes=MAX_BYTES):
+        self.folder = Path(folder)
+        self.max_bytes = max_bytes
+
+    def path(self, key: str):
+        return self.folder / (key + self.suffix)
+
+    def get(self, key: str):
+        """Return cached (DatapointFrame, labels) or None."""
+        path = self.path(key)
+        try:
+            content = path.read_bytes()
+            # mark as recently used
+            os.utime(str(path))
+        except FileNotFoundError:
+            return None
+        try:
+            return decode(content)
+        except (ValueError, EOFError, pickle.UnpicklingError):
+            # written by newer Python or damaged
+            return None
+
+    def put(self, key: str, datapoints, label_list: list):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        # unique temporary file, other processes may write same key
+        with atomic_path(self.path(key)) as tmp:
+            Path(tmp).write_bytes(encode(datapoints, label_list))
+        self.evict()
+
+    def entries(self):
+        """(path, os.stat_result) of cache files, least recently used
+           first. Files deleted meanwhile by other processes are
+           skipped."""
+        if not self.folder.exists():
+            return []
+        result = []
+        for path in self.folder.glob('*' + self.suffix):
+            # skip temporary files of atomic_path() like key.a1b2.tmp.bin
+            if '.' in path.stem:
+                continue
+            try:
+                result.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return sorted(result, key=lambda x: x[1].st_mtime)
+
+    def files(self):
+        """Cache files, least recently used first."""
+        return [path for path, _ in self.entries()]
+
+    def size(self):
+        return sum(stat.st_size for _, stat in self.entries())
+
+    def evict(self):
+        """Delete least recently used files over size limit."""
+        entries = self.entries()
+        total = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if total <= self.max_bytes:
+                break
+            total -= stat.st_size
+            unlink(path)
+
+    def clear(self):
+        for path in self.files():
+            unlink(path)
+
+
+def unlink(path):
+    """Delete file at *path*, unless other process deleted it."""
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
@@ -6,18 +6,43 @@
    save_processed(year, month)
    to_latest(year, month)
    to_excel(year, month)
+
+Parse once, save processed files, update latest folder and Excel file:
+
+   save_all(year, month)
+
+save_processed() also adds the release to vintage store, see kep.vintage.
+
+Download or reprocess many months in parallel:
+
+   download_range(start, end, workers)
+   unpack_range(start, end, workers)
+   rebuild(start, end, workers)
+
+All steps for new releases, with stages overlapping across months,
+are run by kep.pipeline.update() and update_range().
 """
 
 __all__ = ['download', 'unpack', 'convert',
            'save_processed',
-           'to_latest', 'to_excel']
-
+           'to_latest', 'to_excel',
+           'save_all', 'download_range', 'unpack_range', 'rebuild']
+
+from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor,
+                                as_completed)
+import contextlib
+import io
+import os
 import shutil
 
 import kep.load
 import kep.dataframe
+from kep.dataframe import columnar
 import kep.runner
+from kep.vintage import VintageStore
 import kep.utilities.locations as loc
+from kep.utilities.dates import date_span
+from kep.utilities.tempfile import atomic_path
 
 
 def echo(func):
@@ -33,6 +58,30 @@ def download(year: int, month: int):
     return kep.load.download(year, month, filepath)
 
 
+def download_range(start: str, end: str, workers=4, force=False):
+    """Download rar files for months from *start* to *end* (like '2016-12')
+       concurrently. Resumes partial downloads, saves sha256 checksums
+       next to rar files.
+
+       Returns:
+           dictionary of failures like {(2017, 1): 'ConnectionError(...)'}
+    """
+    dates = [(year, month) for year, month in date_span(start, end)
+             if (year, month) >= (2016, 12)]
+    paths = {loc.rarfile(year, month): (year, month) for year, month in dates}
+    jobs = [(kep.load.make_url(year, month), path)
+            for path, (year, month) in paths.items()]
+    results = kep.load.download_many(jobs, workers, force)
+    failures = {}
+    for path, result in results.items():
+        if isinstance(result, Exception):
+            failures[paths[path]] = repr(result)
+            print(f"Failed {path}: {result!r}")
+        else:
+            print(f"Downloaded {path} (sha256 {result})")
+    return failures
+
+
 @echo
 def unpack(year: int, month: int):
     filepath = loc.rarfile(year, month)
@@ -40,6 +89,27 @@ def unpack(year: int, month: int):
     return kep.load.unpack(filepath, folder)
 
 
+def unpack_range(start: str, end: str, workers=4, force=False):
+    """Extract tab*.doc files from rar files for months from *start* to
+       *end* (like '2016-12') concurrently.
+
+       Returns:
+           dictionary of failures like {(2017, 1): 'IOError(...)'}
+    """
+    dates = {loc.rarfile(year, month): (year, month)
+             for year, month in date_span(start, end)}
+    jobs = [(path, loc.raw_folder(year, month))
+            for path, (year, month) in dates.items()]
+    failures = {}
+    for path, result in kep.load.unpack_many(jobs, workers, force).items():
+        if isinstance(result, Exception):
+            failures[dates[path]] = repr(result)
+            print(f"Failed {path}: {result!r}")
+        else:
+            print(result)
+    return failures
+
+
 @echo
 def convert(year: int, month: int):
     folder = loc.raw_folder(year, month)
@@ -47,29 +117,122 @@ def convert(year: int, month: int):
     return kep.load.folder_to_csv(folder, filepath)
 
 
+def save_frame(df, year: int, month: int, freq: str):
+    """Save *df* as processed CSV file and, if pyarrow is installed,
+       as columnar binary file. Returns CSV file path."""
+    path = loc.processed_csv(year, month, freq)
+    with atomic_path(path) as tmp:
+        df.to_csv(tmp)
+    binary_path = loc.processed_binary(year, month, freq)
+    if columnar.available():
+        with atomic_path(binary_path) as tmp:
+            # format is not guessed from temporary file name
+            columnar.save_columnar(df, tmp, '.' + loc.BINARY_SUFFIX)
+    elif os.path.exists(binary_path):
+        # do not leave binary file older than CSV file
+        os.remove(binary_path)
+    return path
+
+
 @echo
 def save_processed(year: int, month: int):
     df_dict = kep.runner.get_dataframe_dict(year, month)
-    for freq, df in df_dict.items():
-        path = loc.processed_csv(year, month, freq)
-        df.to_csv(path)
-        return f"Saved {year}-{month} dataframe to {path}"
+    paths = write_processed(year, month, df_dict)
+    return f"Saved {year}-{month} dataframes to {', '.join(paths)}"
+
+
+def write_excel(df_dict: dict):
+    path = loc.xl_location()
+    with atomic_path(path) as tmp:
+        kep.dataframe.save_excel(tmp, **df_dict)
+    return f'Saved Excel file to {path}'
 
 
 @echo
 def to_excel(year: int, month: int):
-    df_dict =  kep.runner.get_dataframe_dict(year, month)
-    path = loc.xl_location()
-    return kep.dataframe.save_excel(path, **df_dict)
+    df_dict = kep.runner.get_dataframe_dict(year, month)
+    return write_excel(df_dict)
+
+
+@echo
+def save_all(year: int, month: int):
+    """Parse once, save processed files, update latest folder and
+       save Excel file."""
+    df_dict = kep.runner.get_dataframe_dict(year, month)
+    paths = write_processed(year, month, df_dict)
+    print(f"Saved {year}-{month} dataframes to {', '.join(paths)}")
+    to_latest(year, month)
+    return write_excel(df_dict)
 
 
 @echo
 def to_latest(year: int, month: int):
     """Copy CSV files from folder like *processed/2017/04* to *processed/latest*.
+       Columnar binary files are copied if present.
     """
     for freq in 'aqm':
         src = loc.processed_csv(year, month, freq)
         dst = loc.latest_csv(freq)
         shutil.copyfile(src, dst)
         print("Updated", dst)
+        src = loc.processed_binary(year, month, freq)
+        dst = loc.latest_binary(freq)
+        if os.path.exists(src):
+            shutil.copyfile(src, dst)
+            print("Updated", dst)
+        elif os.path.exists(dst):
+            # do not leave binary file older than CSV file
+            os.remove(dst)
     return f"Latest folder now refers to {year}-{month}"
+
+
+def write_processed(year: int, month: int, df_dict: dict):
+    """Save dataframes from *df_dict* as processed CSV and binary files
+       and add them to vintage store. Files are written concurrently.
+
+       Returns:
+           list of CSV file paths
+    """
+    with ThreadPoolExecutor(max_workers=len(df_dict) + 1) as pool:
+        futures = [pool.submit(save_frame, df, year, month, freq)
+                   for freq, df in df_dict.items()]
+        store = VintageStore(loc.vintage_db())
+        futures.append(pool.submit(store.append, year, month, df_dict))
+        results = [future.result() for future in futures]
+    return results[:-1]
+
+
+def rebuild_one(year: int, month: int):
+    """Parse, validate and save processed CSV files for one month.
+       Parsing synopsis is not printed.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_dict = kep.runner.get_dataframe_dict(year, month)
+    write_processed(year, month, df_dict)
+    return f"Saved {year}-{month} dataframes"
+
+
+def rebuild(start: str, end: str, workers=None):
+    """Reprocess all months from *start* to *end* (like '2009-04')
+       in *workers* processes, one month per task.
+
+       A failed month does not stop the batch.
+
+       Returns:
+           dictionary of failures like {(2013, 8): 'ValueError(...)'}
+    """
+    dates = date_span(start, end)
+    failures = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(rebuild_one, year, month): (year, month)
+                   for year, month in dates}
+        for i, future in enumerate(as_completed(futures), 1):
+            year, month = futures[future]
+            try:
+                msg = future.result()
+            except Exception as e:
+                failures[(year, month)] = repr(e)
+                msg = f"Failed {year}-{month}: {e!r}"
+            print(f"[{i}/{len(futures)}] {msg}")
+    print(f"Rebuilt {len(dates) - len(failures)} of {len(dates)} months")
+    return failures
@@ -0,0 +1,80 @@
+"""Save and read dataframes in columnar binary format.
+
+Feather (Arrow IPC) files are written uncompressed, so they can be
+read memory-mapped and only requested columns are touched. Parquet
+files are supported by suffix. Requires *pyarrow*, which is an
+optional dependency - use available() before writing.
+"""
+
+__all__ = ['available', 'save_columnar', 'read_columnar']
+
+SUFFIXES = ('.feather', '.parquet')
+
+
+def available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _suffix(path, suffix=None) -> str:
+    if suffix is None:
+        suffix = '.' + str(path).rsplit('.', 1)[-1]
+    if suffix not in SUFFIXES:
+        raise ValueError(f'{path}: suffix must be any of {SUFFIXES}')
+    return suffix
+
+
+def save_columnar(df, path: str, suffix=None):
+    """Save *df* with its datetime index to *path* (.feather or .parquet).
+       File format is chosen by *suffix*, by default by suffix of *path*.
+    """
+    # Lazy import - pyarrow is optional
+    import pyarrow as pa
+    suffix = _suffix(path, suffix)
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    if suffix == '.feather':
+        import pyarrow.feather
+        pyarrow.feather.write_feather(table, str(path),
+                                      compression='uncompressed')
+    else:
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(table, str(path))
+    return path
+
+
+def index_columns(schema) -> list:
+    """Names of index columns stored in pandas metadata of *schema*."""
+    meta = schema.pandas_metadata or {}
+    return [x for x in meta.get('index_columns', []) if isinstance(x, str)]
+
+
+def read_columnar(path: str, columns=None):
+    """Read dataframe from *path* memory-mapped.
+
+       Args:
+          columns - list of column names to read, all columns if None.
+                    Datetime index is always read.
+       Returns:
+          pd.DataFrame()
+    """
+    import pyarrow.feather
+    import pyarrow.parquet
+    if _suffix(path) == '.feather':
+        read_table, read_schema = (pyarrow.feather.read_table,
+                                   _feather_schema)
+    else:
+        read_table, read_schema = (pyarrow.parquet.read_table,
+                                   pyarrow.parquet.read_schema)
+    if columns is not None:
+        columns = list(columns) + index_columns(read_schema(str(path)))
+    table = read_table(str(path), columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def _feather_schema(path):
+    import pyarrow as pa
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).schema
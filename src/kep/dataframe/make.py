@@ -1,30 +1,16 @@
-import calendar
 import pandas as pd
 
+from kep.engine.frame import as_frame
+
 __all__ = ['unpack_dataframes']
 
 
 # -----------------------------------------------------------------------------
 
-def last_day(year: int, month: int) -> int:
-    """Get a number like 28, 29, 30 or 31."""
-    return calendar.monthrange(year, month)[1]
-
-
-def timestamp(year: int, month: int) -> str:
-    """Make end of month YYYY-MM-DD timestamp."""
-
-    day = last_day(year, month)
-    month = str(month).zfill(2)
-    return f'{year}-{month}-{day}'
-
-
-def make_timestamp(x):
-    date = timestamp(x.year, x.month)
-    try:
-        return pd.Timestamp(date)
-    except ValueError:
-        raise ValueError(date)
+def make_dates(year, month):
+    """Make end of month timestamps from *year* and *month* columns."""
+    start_of_month = pd.to_datetime(dict(year=year, month=month, day=1))
+    return start_of_month + pd.offsets.MonthEnd(0)
 
 # -----------------------------------------------------------------------------
 
@@ -42,11 +28,13 @@ def check_empty(df):
 
 
 def create_base_dataframe(datapoints, freq):
-    df = pd.DataFrame(datapoints)
+    df = as_frame(datapoints).to_dataframe()
     check_empty(df)
     check_duplicates(df)
     # create date
-    df['date'] = df.apply(make_timestamp, axis=1)
+    df['date'] = make_dates(df.year, df.month)
+    # plain string labels, otherwise pivot keeps all categories as columns
+    df['label'] = df.label.astype(str)
     # reshape
     df = df.pivot(columns='label', values='value', index='date')
     # delete some internals for better view
@@ -59,13 +47,9 @@ def create_base_dataframe(datapoints, freq):
 # -----------------------------------------------------------------------------
 
 
-def subset(values, freq):
-    return [x for x in values if x.freq == freq]
-
-
 def separate_dataframes(datapoints, frequencies='aqm'):
-    datapoints = list(datapoints)
-    return [subset(datapoints, freq) for freq in frequencies]
+    groups = as_frame(datapoints).by_frequency()
+    return [groups[freq] for freq in frequencies]
 
 
 def unpack_dataframes(datapoints):
@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+import pandas as pd
+import pytest
+
+from kep.dataframe.columnar import save_columnar, read_columnar
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def df():
+    index = pd.date_range('2017-01-31', periods=3, freq='M')
+    index.freq = None
+    return pd.DataFrame({'year': [2017, 2017, 2017],
+                         'month': [1, 2, 3],
+                         'CPI_rog': [100.6, 100.2, 100.1],
+                         'RETAIL_SALES_yoy': [97.7, 98.2, 100.0]},
+                        index=index)
+
+
+@pytest.mark.parametrize('suffix', ['feather', 'parquet'])
+def test_save_and_read_columnar(df, suffix):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'dfm.' + suffix)
+        save_columnar(df, path)
+        assert read_columnar(path).equals(df)
+        subset = read_columnar(path, ['CPI_rog'])
+        assert subset.equals(df[['CPI_rog']])
+        assert subset.index.dtype == 'datetime64[ns]'
+
+
+def test_save_columnar_on_bad_suffix_raises_error(df):
+    with pytest.raises(ValueError):
+        save_columnar(df, 'dfm.csv')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
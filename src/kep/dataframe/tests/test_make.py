@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+from kep.dataframe.make import make_dates, create_base_dataframe
+from kep.engine.row import Datapoint
+
+
+def test_make_dates():
+    dates = make_dates(pd.Series([2016, 2017]), pd.Series([2, 12]))
+    assert list(dates) == [pd.Timestamp('2016-02-29'),
+                           pd.Timestamp('2017-12-31')]
+
+
+def test_create_base_dataframe():
+    datapoints = [Datapoint('CPI_rog', 'm', 2017, 1, 100.6),
+                  Datapoint('CPI_rog', 'm', 2017, 2, 100.2),
+                  Datapoint('GDP_yoy', 'm', 2017, 2, 101.0)]
+    df = create_base_dataframe(datapoints, 'm')
+    assert list(df.columns) == ['year', 'CPI_rog', 'GDP_yoy']
+    assert df.loc['2017-02-28', 'CPI_rog'] == 100.2
+    assert df.loc['2017-01-31', 'year'] == 2017
+
+
+def test_create_base_dataframe_on_empty_list_raises_error():
+    with pytest.raises(ValueError):
+        create_base_dataframe([], 'a')
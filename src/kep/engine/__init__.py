@@ -1,3 +1,3 @@
-from .reader import read_tables
+from .reader import read_tables, iter_tables
 from .parser import parse_tables, datapoints
 from .validate import validate
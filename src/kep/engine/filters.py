@@ -11,10 +11,77 @@ Bad friends:
 import re
 from datetime import date
 
-__all__ = ['clean_year', 'clean_value', 'is_omission']
+__all__ = ['clean_year', 'clean_value', 'is_omission',
+           'clean_years', 'clean_values']
 
+YEAR_MIN, YEAR_MAX = 1999, date.today().year
+YEARS = {str(x): x for x in range(YEAR_MIN, YEAR_MAX + 1)}
 
-def make_regex_annual(start=1999, end=date.today().year):
+# every 4-digit window, overlapping
+REGEX_FOUR_DIGITS = re.compile(r'(?=([0-9]{4}))')
+
+
+def clean_year(year: str) -> int:
+    """Return first year between YEAR_MIN and YEAR_MAX found in *year*
+       string or None."""
+    # most cells start with year, like '2015' or '20151)'
+    x = YEARS.get(year[:4])
+    if x:
+        return x
+    for match in REGEX_FOUR_DIGITS.finditer(year):
+        x = YEARS.get(match.group(1))
+        if x:
+            return x
+    return None
+
+
+# FIXME: regex below is not too good
+REGEX_DIGITS = re.compile(r'(\d*?[.,]?\d*?)(\d\))*\s*$')
+
+
+def strip_comments(x: str) -> str:
+    """Drop trailing comments like '1)' or '1)2)'."""
+    while x[-1:] == ')' and x[-2:-1].isdecimal():
+        x = x[:-2]
+    return x
+
+
+def clean_value(x: str) -> float:
+    if x:
+        x = x.replace(',', '.')
+        number = strip_comments(x)
+        # plain number like '100' or '99.5', same result as regex
+        if number.replace('.', '', 1).isdecimal():
+            return float(number)
+        z = re.search(REGEX_DIGITS, x).group(1)
+        return float(z)
+    return None
+
+
+OMISSIONS = frozenset(['', '…', '-'])
+
+
+def is_omission(x: str) -> bool:
+    """True if *x* is any of ['', '…', '-']"""
+    return x in OMISSIONS
+
+
+def clean_years(column) -> list:
+    """Apply clean_year() to all strings in *column*."""
+    return [clean_year(x) for x in column]
+
+
+def clean_values(column) -> list:
+    """Apply clean_value() to all strings in *column*,
+       omissions become None."""
+    return [None if x in OMISSIONS else clean_value(x) for x in column]
+
+# -----------------------------------------------------------------------------
+# Reference implementations, compared with the functions above in tests
+# and in kep.benchmark
+
+
+def make_regex_annual(start=YEAR_MIN, end=YEAR_MAX):
     rng = [str(x) for x in range(start, end + 1)]
     years = "|".join(rng)
     return re.compile(f"({years})")
@@ -23,7 +90,7 @@ def make_regex_annual(start=1999, end=date.today().year):
 REGEX_ANNUAL = make_regex_annual()
 
 
-def clean_year(year: str) -> int:
+def clean_year_by_regex(year: str) -> int:
     try:
         x = re.findall(REGEX_ANNUAL, year)[0]
         return int(x)
@@ -31,18 +98,9 @@ def clean_year(year: str) -> int:
         return None
 
 
-# FIXME: regex below is not too good
-REGEX_DIGITS = re.compile(r'(\d*?[.,]?\d*?)(\d\))*\s*$')
-
-
-def clean_value(x: str) -> float:
+def clean_value_by_regex(x: str) -> float:
     if x:
         x = x.replace(',', '.')
         z = re.search(REGEX_DIGITS, x).group(1)
         return float(z)
     return None
-
-
-def is_omission(x: str) -> bool:
-    """True if *x* is any of ['', '…', '-']"""
-    return x in ['', '…', '-']
@@ -0,0 +1,175 @@
+"""Columnar container for datapoints.
+
+DatapointFrame keeps datapoints as a struct of arrays: label and
+frequency codes, year, month and value. It is a compact replacement
+for a list of Datapoint instances and can be handed over to pandas
+without copying numeric columns.
+"""
+import numpy as np
+import pandas as pd
+
+from kep.engine.row import Datapoint, FREQUENCIES
+
+__all__ = ['DatapointFrame', 'as_frame']
+
+
+class DatapointFrame:
+    """Datapoints as arrays.
+
+    Attributes:
+        labels - sorted list of label strings like 'CPI_rog'
+        label_codes - int16 array, position of label in *labels*
+        freq_codes - int8 array, position of frequency in 'aqm'
+        year - int16 array
+        month - int8 array
+        value - float64 array
+    """
+
+    __slots__ = ('labels', 'label_codes', 'freq_codes',
+                 'year', 'month', 'value')
+
+    def __init__(self, labels, label_codes, freq_codes, year, month, value):
+        self.labels = list(labels)
+        self.label_codes = np.asarray(label_codes, dtype=np.int16)
+        self.freq_codes = np.asarray(freq_codes, dtype=np.int8)
+        self.year = np.asarray(year, dtype=np.int16)
+        self.month = np.asarray(month, dtype=np.int8)
+        self.value = np.asarray(value, dtype=np.float64)
+
+    @classmethod
+    def from_datapoints(cls, datapoints):
+        """Make DatapointFrame from iterable of Datapoint instances."""
+        datapoints = list(datapoints)
+        labels = sorted(set(d.label for d in datapoints))
+        label_position = {label: i for i, label in enumerate(labels)}
+        freq_position = {freq: i for i, freq in enumerate(FREQUENCIES)}
+        return cls(labels,
+                   [label_position[d.label] for d in datapoints],
+                   [freq_position[d.freq] for d in datapoints],
+                   [d.year for d in datapoints],
+                   [d.month for d in datapoints],
+                   [d.value for d in datapoints])
+
+    @classmethod
+    def from_tables(cls, tables):
+        """Make DatapointFrame from parsed *tables* without making
+           Datapoint instances, same datapoints as parser.datapoints()."""
+        columns = [], [], [], []
+        table_labels, sizes = [], []
+        for t in tables:
+            if not t:
+                continue
+            n = len(columns[0])
+            t.emit_columns(columns)
+            table_labels.append(t.label)
+            sizes.append(len(columns[0]) - n)
+        labels = sorted(set(label for label, size in
+                            zip(table_labels, sizes) if size))
+        label_position = {label: i for i, label in enumerate(labels)}
+        codes = np.repeat(np.array([label_position.get(label, -1)
+                                    for label in table_labels],
+                                   dtype=np.int16),
+                          sizes)
+        return cls(labels, codes, *columns)
+
+    @classmethod
+    def concat(cls, frames):
+        """Join *frames* into one DatapointFrame."""
+        frames = list(frames)
+        labels = sorted(set(label for f in frames for label in f.labels))
+        label_position = {label: i for i, label in enumerate(labels)}
+        codes = []
+        for f in frames:
+            recode = np.array([label_position[label] for label in f.labels],
+                              dtype=np.int16)
+            codes.append(recode[f.label_codes])
+
+        def join(attr, dtype):
+            arrays = [getattr(f, attr) for f in frames]
+            return np.concatenate(arrays) if arrays else np.array([], dtype)
+        return cls(labels,
+                   np.concatenate(codes) if codes else [],
+                   join('freq_codes', np.int8),
+                   join('year', np.int16),
+                   join('month', np.int8),
+                   join('value', np.float64))
+
+    def __len__(self):
+        return len(self.value)
+
+    def __iter__(self):
+        for code, freq_code, year, month, value in zip(
+                self.label_codes.tolist(), self.freq_codes.tolist(),
+                self.year.tolist(), self.month.tolist(), self.value.tolist()):
+            yield Datapoint(self.labels[code], FREQUENCIES[freq_code],
+                            year, month, value)
+
+    def __eq__(self, x):
+        return list(self) == list(x)
+
+    def __contains__(self, datapoint):
+        try:
+            code = self.labels.index(datapoint.label)
+            freq_code = FREQUENCIES.index(datapoint.freq)
+        except ValueError:
+            return False
+        mask = ((self.label_codes == code) &
+                (self.freq_codes == freq_code) &
+                (self.year == datapoint.year) &
+                (self.month == datapoint.month) &
+                (self.value == datapoint.value))
+        return bool(mask.any())
+
+    def __repr__(self):
+        return 'DatapointFrame(<{} datapoints, {} labels>)'.format(
+            len(self), len(self.labels))
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, attr).nbytes for attr in
+                   ['label_codes', 'freq_codes', 'year', 'month', 'value'])
+
+    def take(self, mask):
+        """Return DatapointFrame with rows selected by *mask*."""
+        return DatapointFrame(self.labels,
+                              self.label_codes[mask],
+                              self.freq_codes[mask],
+                              self.year[mask],
+                              self.month[mask],
+                              self.value[mask])
+
+    def subset(self, freq: str):
+        return self.take(self.freq_codes == FREQUENCIES.index(freq))
+
+    def by_frequency(self):
+        """Split frame by frequency in one pass.
+
+           Returns:
+               dictionary like {'a': DatapointFrame, 'q': ..., 'm': ...}
+        """
+        order = np.argsort(self.freq_codes, kind='stable')
+        counts = np.bincount(self.freq_codes, minlength=len(FREQUENCIES))
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        return {freq: self.take(order[bounds[i]:bounds[i + 1]])
+                for i, freq in enumerate(FREQUENCIES)}
+
+    def to_dataframe(self):
+        """Return pandas dataframe with label, freq, year, month and value
+           columns. Labels and frequencies are categorical."""
+        label = pd.Categorical.from_codes(self.label_codes,
+                                          categories=self.labels)
+        freq = pd.Categorical.from_codes(self.freq_codes,
+                                         categories=FREQUENCIES)
+        return pd.DataFrame({'label': label,
+                             'freq': freq,
+                             'year': self.year,
+                             'month': self.month,
+                             'value': self.value},
+                            copy=False)
+
+
+def as_frame(datapoints):
+    """Accept DatapointFrame or iterable of Datapoint instances."""
+    if isinstance(datapoints, DatapointFrame):
+        return datapoints
+    return DatapointFrame.from_datapoints(datapoints)
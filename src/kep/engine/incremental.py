@@ -0,0 +1,128 @@
+"""Re-apply edited parsing instructions to tables of one CSV file.
+
+Reparser keeps tables after stage 1 (units), header matches for every
+instruction string seen so far and datapoints emitted by every table.
+On each parse() call:
+
+  - tables are reset to their state after stage 1,
+  - instruction documents are applied in same order as in parse_tables(),
+    recording which tables and labels each document changed,
+  - only tables with a new (name, unit, row_format) emit datapoints again,
+    other datapoints are reused.
+
+Use changed_documents() to see which instruction documents were edited and
+Reparser.affected_labels() to see labels that depend on them.
+"""
+from copy import copy
+import json
+
+from kep.engine.parser import (parse_units, apply_commands, parse_segment,
+                               parsed, instruction_strings)
+from kep.engine.reader import HeaderMatcher
+
+__all__ = ['Reparser', 'changed_documents']
+
+
+def document_key(doc: dict) -> str:
+    """Stable text representation of instruction document *doc*."""
+    return json.dumps(doc, sort_keys=True, ensure_ascii=False)
+
+
+def changed_documents(old_dicts: list, new_dicts: list):
+    """Return keys of documents in *old_dicts* and *new_dicts*
+       that are not present in both lists."""
+    old = set(map(document_key, old_dicts))
+    new = set(map(document_key, new_dicts))
+    return old ^ new
+
+
+def state(table):
+    return table.name, table.unit, table.row_format
+
+
+def set_state(table, values):
+    table.name, table.unit, table.row_format = values
+
+
+class Reparser:
+    """Parse tables of one CSV file many times with changing instructions."""
+
+    def __init__(self, tables, units_dict):
+        self.tables = parse_units(tables, units_dict)
+        self.base_states = [state(t) for t in self.tables]
+        # instruction string -> set of table positions with headers matched
+        self.hit_positions = {}
+        # table position -> (state, datapoints)
+        self.emitted = {}
+        # document key -> set of labels the document produced,
+        # kept for previous versions of documents too
+        self.provenance = {}
+        self.reused = 0
+
+    def reset(self):
+        for t, values in zip(self.tables, self.base_states):
+            set_state(t, values)
+
+    def annotate(self, strings):
+        """Set header hits on tables, scan headers for new strings only."""
+        new_strings = [s for s in dict.fromkeys(strings)
+                       if s not in self.hit_positions]
+        if new_strings:
+            matcher = HeaderMatcher(new_strings)
+            for s in new_strings:
+                self.hit_positions[s] = set()
+            for i, t in enumerate(self.tables):
+                for s in matcher.hits(t.headers):
+                    self.hit_positions[s].add(i)
+        matcher = HeaderMatcher(strings)
+        for i, t in enumerate(self.tables):
+            t.matcher = matcher
+            t.header_hits = frozenset(s for s in matcher.strings
+                                      if i in self.hit_positions[s])
+
+    def _record(self, doc, before):
+        changed = [t for t, values in zip(self.tables, before)
+                   if state(t) != values]
+        self.provenance[document_key(doc)] = {t.label for t in parsed(changed)}
+
+    def parse(self, common_dicts, segment_dicts):
+        """Return parsed tables, same result as parse_tables()."""
+        self.reset()
+        self.annotate(instruction_strings(common_dicts, segment_dicts))
+        for d in common_dicts:
+            before = [state(t) for t in self.tables]
+            apply_commands(self.tables, [d])
+            self._record(d, before)
+        parsed_tables = parsed(self.tables)
+        for sd in segment_dicts:
+            before = [state(t) for t in self.tables]
+            parsed_tables.extend(parse_segment(copy(self.tables), **sd))
+            self._record(sd, before)
+        return parsed_tables
+
+    def datapoints(self, parsed_tables):
+        """Return datapoints from *parsed_tables*, reusing datapoints of
+           tables that did not change since previous call."""
+        positions = {id(t): i for i, t in enumerate(self.tables)}
+        result = []
+        for t in parsed_tables:
+            i = positions[id(t)]
+            key = state(t)
+            try:
+                previous_key, values = self.emitted[i]
+            except KeyError:
+                previous_key = None
+            if previous_key == key:
+                self.reused += 1
+            else:
+                values = list(t.emit_datapoints())
+                self.emitted[i] = key, values
+            result.extend(values)
+        return result
+
+    def affected_labels(self, document_keys):
+        """Labels produced by documents with *document_keys*."""
+        labels = set()
+        for key in document_keys:
+            labels.update(self.provenance.get(key, set()))
+        return labels
@@ -0,0 +1,186 @@
+"""Index of table positions in one interim CSV file.
+
+TableIndex maps every instruction header string and every section
+number (like '3.5.') to sorted positions of tables with these headers.
+Index is saved next to interim CSV file and rebuilt when the CSV file
+or the set of instruction strings changes. With index attached to
+tables, trimming segments and header lookups in kep.engine.parser do
+not scan the table list.
+
+HeaderCache keeps units and header hits by header text for tables
+from many CSV files, same headers repeat in almost every month.
+"""
+from bisect import bisect_left
+import hashlib
+import os
+import pickle
+import re
+
+from kep.utilities.tempfile import atomic_path
+
+__all__ = ['TableIndex', 'HeaderCache', 'section_numbers',
+           'load_index', 'save_index']
+
+# increase when index content changes
+VERSION = 1
+PICKLE_PROTOCOL = 4
+
+REGEX_SECTION = re.compile(r'^\s*(\d+(?:\.\d+)*\.)\s')
+
+
+def section_numbers(headers) -> list:
+    """Section numbers like '3.5.' found at start of *headers*."""
+    result = []
+    for header in headers:
+        match = REGEX_SECTION.match(header)
+        if match:
+            result.append(match.group(1))
+    return result
+
+
+class TableIndex:
+    """Positions of tables by header string and section number.
+
+    Attributes:
+        size - number of tables in CSV file
+        positions - {instruction string: [table positions]}
+        sections - {section number: [table positions]}
+    """
+
+    def __init__(self, size, positions, sections):
+        self.size = size
+        self.positions = positions
+        self.sections = sections
+
+    @classmethod
+    def build(cls, tables, matcher):
+        """Scan headers of *tables* once with HeaderMatcher *matcher*."""
+        matcher.annotate(tables)
+        return cls.from_hits([t.header_hits for t in tables],
+                             [section_numbers(t.headers) for t in tables],
+                             matcher.strings)
+
+    @classmethod
+    def from_hits(cls, hits, sections, strings):
+        """Make index from header hits and section numbers of
+           every table."""
+        positions = {s: [] for s in strings}
+        section_positions = {}
+        for i, (found, numbers) in enumerate(zip(hits, sections)):
+            for s in found:
+                positions[s].append(i)
+            for number in numbers:
+                section_positions.setdefault(number, []).append(i)
+        return cls(len(hits), positions, section_positions)
+
+    def annotate(self, tables, matcher):
+        """Set header hits and positions on *tables* without reading
+           headers. *tables* must be the tables index was built from."""
+        if len(tables) != self.size:
+            raise ValueError(f'index is for {self.size} tables, '
+                             f'got {len(tables)}')
+        hits = [[] for _ in tables]
+        for s, positions in self.positions.items():
+            for i in positions:
+                hits[i].append(s)
+        for i, t in enumerate(tables):
+            t.matcher = matcher
+            t.header_hits = frozenset(hits[i])
+        return self.attach(tables)
+
+    def attach(self, tables):
+        """Set positions on *tables* for lookups with this index."""
+        for i, t in enumerate(tables):
+            t.position = i
+            t.index = self
+        return tables
+
+    def first(self, strings, start=0, end=None):
+        """Return first position between *start* and *end* of table
+           with headers matching any of *strings*, None if not found.
+
+           Raises:
+               KeyError if some of *strings* is not indexed
+        """
+        if end is None:
+            end = self.size
+        found = end
+        for s in strings:
+            positions = self.positions[s]
+            k = bisect_left(positions, start)
+            if k < len(positions) and positions[k] < found:
+                found = positions[k]
+        return found if found < end else None
+
+    def section(self, number: str) -> list:
+        """Positions of tables with section *number* like '3.5.'"""
+        return self.sections.get(number, [])
+
+
+class HeaderCache:
+    """Units, header hits and section numbers of tables by their
+       header strings."""
+
+    def __init__(self, unit_index, matcher):
+        self.unit_index = unit_index
+        self.matcher = matcher
+        # tuple of headers -> (unit, header hits, section numbers)
+        self.known = {}
+
+    def lookup(self, headers):
+        key = tuple(headers)
+        try:
+            return self.known[key]
+        except KeyError:
+            unit = None
+            for header in headers:
+                unit = self.unit_index.find(header) or unit
+            value = self.known[key] = (unit, self.matcher.hits(headers),
+                                       section_numbers(headers))
+            return value
+
+    def annotate(self, tables):
+        """Set units, header hits and TableIndex on *tables*, read
+           headers only if not seen before."""
+        values = [self.lookup(t.headers) for t in tables]
+        for t, (unit, hits, _) in zip(tables, values):
+            if unit:
+                t.unit = unit
+            t.matcher = self.matcher
+            t.header_hits = hits
+        index = TableIndex.from_hits([v[1] for v in values],
+                                     [v[2] for v in values],
+                                     self.matcher.strings)
+        return index.attach(tables)
+
+# -----------------------------------------------------------------------------
+
+
+def index_key(csv_path, strings) -> tuple:
+    """Identify content of *csv_path* and instruction *strings*."""
+    stat = os.stat(str(csv_path))
+    digest = hashlib.sha1('\n'.join(sorted(strings)).encode()).hexdigest()
+    return VERSION, stat.st_size, stat.st_mtime_ns, digest
+
+
+def save_index(index, path, csv_path, strings):
+    content = dict(key=index_key(csv_path, strings), index=index)
+    with atomic_path(path) as tmp:
+        with open(tmp, 'wb') as f:
+            # protocol readable by all supported Python versions
+            pickle.dump(content, f, protocol=PICKLE_PROTOCOL)
+
+
+def load_index(path, csv_path, strings):
+    """Return TableIndex saved at *path* or None, if there is no file
+       or *csv_path* or instruction *strings* changed since saving."""
+    try:
+        with open(str(path), 'rb') as f:
+            content = pickle.load(f)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError,
+            AttributeError):
+        # ValueError is raised for unsupported pickle protocol
+        return None
+    if content.get('key') != index_key(csv_path, strings):
+        return None
+    return content['index']
@@ -1,5 +1,9 @@
 from copy import copy
 
+from kep.engine.reader import HeaderMatcher
+from kep.engine.layout import TableIndex
+import kep.utilities.metrics as metrics
+
 
 def iterate(x)-> list:
     """Mask string as [x] list."""
@@ -29,10 +33,11 @@ def assert_labels_found(tables, name, units):
     """Assert that labels defined by *name* and *units*
        are found in *tables*.
     """
-    current_labels = labels(parsed(tables))
-    not_found_list = not_found(current_labels, name, units)
+    # only tables with *name* can have expected labels
+    found_labels = {(t.name, t.unit) for t in tables if t.name == name}
+    not_found_list = not_found(found_labels, name, units)
     if not_found_list:
-        raise_not_found(not_found_list, current_labels)
+        raise_not_found(not_found_list, labels(parsed(tables)))
 
 # atomic parsing functions
 
@@ -47,32 +52,69 @@ def extract_unit(text: str, units_dict: dict):
     Returns:
        str like 'rog' or 'bln_usd
     """
-    found = []
-    for pat in units_dict.keys():
-        if pat in text:
-            found.append(pat)
-    if found:
-        # match largest string found
-        pat = max(found, key=len)
-        return units_dict[pat]
-    return ''
+    return unit_index(units_dict).find(text)
+
+
+class UnitIndex:
+    """Find unit of measurement in header text, cache result by text."""
+
+    def __init__(self, units_dict: dict):
+        self.units_dict = units_dict
+        # longest patterns go first, stable sort keeps ties in dict order
+        self.patterns = sorted(units_dict.keys(), key=len, reverse=True)
+        self.cache = {}
+
+    def _find(self, text):
+        for pat in self.patterns:
+            if pat in text:
+                # this is largest string found
+                return self.units_dict[pat]
+        return ''
+
+    def find(self, text: str):
+        try:
+            return self.cache[text]
+        except KeyError:
+            unit = self.cache[text] = self._find(text)
+            return unit
+
+
+# headers repeat across monthly files, keep one index per units_dict
+_UNIT_INDEXES = {}
+
+
+def unit_index(units_dict: dict):
+    key = tuple(units_dict.items())
+    try:
+        return _UNIT_INDEXES[key]
+    except KeyError:
+        index = _UNIT_INDEXES[key] = UnitIndex(units_dict)
+        return index
 
 
 def parse_units(tables, units_dict):
-    """Stage 1 of the table parsing algorithm."""
+    """Stage 1 of the table parsing algorithm.
+
+    *tables* can be an iterator, tables are consumed as they arrive.
+
+    Returns:
+        list of tables
+    """
+    index = unit_index(units_dict)
+    result = []
     for t in tables:
         for header in t.headers:
-            unit = extract_unit(header, units_dict)
+            unit = index.find(header)
             if unit:
                 t.unit = unit
+        result.append(t)
+    return result
 
 
 def parse_headers(tables, name, headers):
-    headers = iterate(headers)
-    for t in tables:
-        if t.contains_any(headers):
-            t.name = name
-            break
+    i = first_match(tables, iterate(headers))
+    if i is not None:
+        tables[i].name = name
 
 
 def assign_units(tables, units):
@@ -119,24 +161,45 @@ def trail_down_names(tables, name, units):
 # limit scope
 
 
+def first_match(tables, strings):
+    """Return position in *tables* of first table with headers matching
+       any of *strings* or None.
+
+       Uses TableIndex if *tables* is a contiguous run of indexed tables,
+       otherwise checks tables one by one.
+    """
+    if tables:
+        start, end = tables[0].position, tables[-1].position
+        index = tables[0].index
+        if (index is not None and start is not None
+                and end - start == len(tables) - 1):
+            try:
+                i = index.first(strings, start, end + 1)
+            except KeyError:
+                pass
+            else:
+                return None if i is None else i - start
+    for i, t in enumerate(tables):
+        if t.contains_any(strings):
+            return i
+    return None
+
+
 def trim_start(tables, start_strings):
     """Drop tables before any of *start_strings*."""
-    start_strings = iterate(start_strings)
-    for i, t in enumerate(tables):
-        if t.contains_any(start_strings):
-            break
+    i = first_match(tables, iterate(start_strings))
+    if i is None:
+        # keep last table, as previous versions did
+        i = len(tables) - 1
     return tables[i:]
 
 
 def trim_end(tables, end_strings):
     """Drop tables after any of *end_strings*."""
-    end_strings = iterate(end_strings)
-    we_are_in_segment = True
-    for i, t in enumerate(tables):
-        if t.contains_any(end_strings):
-            we_are_in_segment = False
-        if not we_are_in_segment:
-            break
+    i = first_match(tables, iterate(end_strings))
+    if i is None:
+        # drop last table, as previous versions did
+        i = len(tables) - 1
     return tables[:i]
 
 # reference functions
@@ -163,9 +226,28 @@ def select(tables, name):
 
 
 def find(tables, string):
-    for t in tables:
-        if t.contains_any([string]):
-            return t
+    i = first_match(tables, [string])
+    if i is not None:
+        return tables[i]
+
+# header matching
+
+
+def instruction_strings(common_dicts, segment_dicts):
+    """Return all header strings used in parsing instructions."""
+    strings = []
+    for d in common_dicts:
+        strings.extend(iterate(d['headers']))
+    for sd in segment_dicts:
+        strings.extend(iterate(sd['start_with']))
+        strings.extend(iterate(sd['end_with']))
+        for d in sd['commands']:
+            strings.extend(iterate(d['headers']))
+    return strings
+
+
+def make_matcher(common_dicts, segment_dicts):
+    return HeaderMatcher(instruction_strings(common_dicts, segment_dicts))
 
 # parsing batch functions
 
@@ -193,10 +275,16 @@ def parse_after_units(tables,
 
 def apply_commands(tables, dicts):
     for d in dicts:
-        try:
-            parse_after_units(tables, **d)
-        except TypeError:
-            raise ValueError(d)
+        name = d.get('name')
+        with metrics.timer('instruction', instruction=name):
+            try:
+                parse_after_units(tables, **d)
+            except TypeError:
+                raise ValueError(d)
+        if metrics.enabled():
+            matched = sum(1 for t in tables if t.name == name)
+            metrics.count('instruction_tables_matched', matched,
+                          instruction=name)
     return tables
 
 
@@ -229,14 +317,35 @@ def parse_segment(tables, start_with, end_with, commands):
 def parse_tables(tables,
                  common_dicts,
                  segment_dicts,
-                 units_dict):
-    parse_units(tables, units_dict)
-    parsed_tables = parse_common(tables, common_dicts, units_dict)
+                 units_dict,
+                 matcher=None,
+                 index=None):
+    # *tables* may be a generator like iter_tables(filepath),
+    # then reading the file is timed as part of this stage.
+    # *index* is a TableIndex of *tables*, made by TableIndex.build()
+    with metrics.timer('stage', stage='parse_units'):
+        tables = parse_units(tables, units_dict)
+    metrics.count('tables_seen', len(tables))
+    with metrics.timer('stage', stage='apply_commands'):
+        # scan headers once for all instruction strings
+        if matcher is None:
+            matcher = make_matcher(common_dicts, segment_dicts)
+        if index is None:
+            index = TableIndex.build(tables, matcher)
+        index.annotate(tables, matcher)
+        parsed_tables = parse_annotated(tables, common_dicts, segment_dicts)
+    metrics.count('tables_matched', len(parsed_tables))
+    return parsed_tables
+
+
+def parse_annotated(tables, common_dicts, segment_dicts):
+    """Stage 2 of parse_tables() for *tables* with units,
+       header hits and TableIndex already set."""
+    # units are already defined, skip stage 1 of parse_common()
+    parsed_tables = parsed(apply_commands(tables, common_dicts))
     for sd in segment_dicts:
-        # make a copy, otherwise we will sploil the next run of function
-        tables2 = copy(tables)
-        new_tables = parse_segment(tables2, **sd)
-        parsed_tables.extend(new_tables)
+        # trimming makes new lists, *tables* list is not changed
+        parsed_tables.extend(parse_segment(tables, **sd))
     return parsed_tables
 
 # values
@@ -244,4 +353,6 @@ def parse_tables(tables,
 
 def datapoints(tables):
     """Return a list of values from parsed tables."""
-    return [x for t in parsed(tables) for x in t.emit_datapoints()]
+    result = [x for t in parsed(tables) for x in t.emit_datapoints()]
+    metrics.count('datapoints_emitted', len(result))
+    return result
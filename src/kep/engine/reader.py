@@ -1,13 +1,19 @@
-"""Convert CSV file to Table() instances. Use get_tables(filepath)."""
+"""Convert CSV file to Table() instances. Use read_tables(filepath) or
+   iter_tables(filepath) to get tables one by one while file is being read."""
 
 from enum import Enum, unique
+import mmap
+import os
 import re
 import pprint
 
-from kep.engine.row import get_row_format, emit_datapoints
+import numpy as np
 
+from kep.engine.row import get_row_format, emit_block, as_datapoints
+import kep.utilities.metrics as metrics
 
-__all__ = ['read_tables', 'split_csv', 'Table']
+
+__all__ = ['read_tables', 'iter_tables', 'split_csv', 'Table', 'HeaderMatcher']
 
 # 'I' accounts for quarterly headers in I, II, III and IV
 RE_LITERALS = re.compile(r'[а-яI]')
@@ -28,15 +34,95 @@ def is_allowed(row):
 
 
 def read_tables(filepath: str):
-    rows = filter(is_allowed, read_csv(filepath))
-    table_dicts = split_csv(rows)
-    return [Table(**td) for td in table_dicts]
+    return list(iter_tables(filepath))
+
+
+def iter_tables(filepath: str):
+    """Yield Table() instances from CSV file at *filepath*.
+
+       File is memory-mapped, not read to memory. Data rows of tables
+       refer to the map until tokenized, see release_rows()."""
+    buf = map_file(filepath)
+    if buf is None:
+        return
+    if has_carriage_return(buf):
+        buf.close()
+        tables = iter_split_classified(classify(read_csv(filepath)))
+    else:
+        tables = split_bytes(buf)
+    for td in tables:
+        yield Table(**td)
+
+
+def release_rows(tables):
+    """Tokenize data rows of *tables*, so that they no longer refer to
+       memory-mapped CSV file. Map is closed once other tables from
+       the file are dropped."""
+    for t in tables:
+        t.datarows
+    return tables
 
 
 def read_csv(filepath: str):
     with open(filepath, 'r', encoding='utf-8') as f:
-        for row in f.read().splitlines():
-            yield row
+        for row in f:
+            yield row.rstrip('\n')
+
+# bytes scan
+
+
+def classify(rows):
+    """Return list of (row, is_data) tuples for allowed *rows*."""
+    return [(row, is_data_row(row)) for row in filter(is_allowed, rows)]
+
+
+def count_in_lines(mask, starts, ends):
+    """Number of True values of *mask* in each line."""
+    positions = np.flatnonzero(mask)
+    return (np.searchsorted(positions, ends) -
+            np.searchsorted(positions, starts))
+
+
+def literal_mask(a):
+    """Mark 'I' and UTF-8 lead bytes of lowercase letters а-я in byte
+       array *a*, same as RE_LITERALS for decoded text."""
+    mask = a == ord('I')
+    lead, follow = a[:-1], a[1:]
+    # U+0430-U+043F are D0 B0-BF, U+0440-U+044F are D1 80-8F
+    mask[:-1] |= (lead == 0xD0) & (follow >= 0xB0) & (follow <= 0xBF)
+    mask[:-1] |= (lead == 0xD1) & (follow >= 0x80) & (follow <= 0x8F)
+    return mask
+
+
+def allowed_lines(buf):
+    """Return start and end offsets and data row flags of allowed rows
+       in UTF-8 *buf* as lists. Line ends, '_' and literals are found
+       in raw bytes."""
+    a = np.frombuffer(buf, dtype=np.uint8)
+    newlines = np.flatnonzero(a == ord('\n'))
+    starts = np.concatenate([[0], newlines + 1])
+    ends = np.concatenate([newlines, [len(a)]])
+    allowed = ((ends > starts) &
+               (count_in_lines(a == ord('_'), starts, ends) == 0))
+    is_data = count_in_lines(literal_mask(a), starts, ends) == 0
+    del a  # release buffer
+    positions = np.flatnonzero(allowed)
+    return (starts[positions].tolist(), ends[positions].tolist(),
+            is_data[positions].tolist())
+
+
+def has_carriage_return(buf):
+    # text mode reader also breaks lines at '\r'
+    return buf.find(b'\r') != -1
+
+
+def map_file(filepath: str):
+    """Return read-only memory map of file at *filepath*, None for
+       empty file. Map is closed when no longer referenced."""
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
 # split to tables
 
@@ -57,25 +143,34 @@ def split_csv(rows):
 
        Args:
            csv_rows - list of rows or iterator
-           is_data_row - function
 
        Returns:
            list of dictionaries
     """
-    result = []
+    return list(iter_split(rows))
+
+
+def iter_split(rows):
+    """Yield dictionaries with header and data rows from *rows* iterator.
+       A dictionary is emitted once next table header starts.
+    """
+    return iter_split_classified((row, is_data_row(row)) for row in rows)
+
+
+def iter_split_classified(pairs):
+    """Same as iter_split() for (row, is_data) tuples."""
     datarows, headers = [], []
     state = State.INIT
-    for row in rows:
+    for row, is_data in pairs:
         # is this a data row?
-        if is_data_row(row):
+        if is_data:
             # this is a data row!
             datarows.append(row)
             state = State.DATA
         else:
             if state == State.DATA:
                 # table ended, emit it
-                t = as_dict(headers, datarows)
-                result.append(t)
+                yield as_dict(headers, datarows)
                 # reset containers
                 headers = []
                 datarows = []
@@ -83,9 +178,57 @@ def split_csv(rows):
             state = State.HEADERS
     # still have some data left, emit it too
     if len(headers) > 0 and len(datarows) > 0:
-        t = as_dict(headers, datarows)
-        result.append(t)
-    return result
+        yield as_dict(headers, datarows)
+
+
+class RowBlock:
+    """Rows of *buf* between *starts* and *ends* offsets,
+       decoded from UTF-8 when iterated."""
+
+    __slots__ = ('buf', 'starts', 'ends')
+
+    def __init__(self, buf, starts, ends):
+        self.buf = buf
+        self.starts = starts
+        self.ends = ends
+
+    def __iter__(self):
+        buf = self.buf
+        return (buf[s:e].decode('utf-8')
+                for s, e in zip(self.starts, self.ends))
+
+    def __len__(self):
+        return len(self.starts)
+
+
+def split_bytes(buf):
+    """Same as iter_split_classified(classify(rows)) for rows of UTF-8
+       *buf*, data rows are returned as RowBlock and decoded only
+       when used."""
+    starts, ends, is_data = allowed_lines(buf)
+    flags = np.array(is_data, dtype=np.int8)
+    edges = np.diff(np.concatenate([[0], flags, [0]]))
+    run_starts = np.flatnonzero(edges == 1).tolist()
+    run_ends = np.flatnonzero(edges == -1).tolist()
+    n = len(is_data)
+    # rows before a block of data rows are its headers
+    header_start = 0
+    for a, b in zip(run_starts, run_ends):
+        headers = [buf[s:e].decode('utf-8') for s, e in
+                   zip(starts[header_start:a], ends[header_start:a])]
+        # table is emitted when next header starts or if it has headers
+        if headers or b < n:
+            yield as_dict(headers, RowBlock(buf, starts[a:b], ends[a:b]))
+        header_start = b
+
+
+def tokenize(datarow_strings):
+    """Split data rows by tab once.
+
+    Returns:
+        list of tuples of strings
+    """
+    return [tuple(row.split('\t')) for row in datarow_strings]
 
 
 class Table:
@@ -97,17 +240,38 @@ class Table:
                  name=None,
                  unit=None):
         self.headers = header_strings
+        # data rows are tokenized on first use and never split again,
+        # most tables in a file are not parsed and never tokenized.
+        # *datarow_strings* may be a RowBlock, decoded on first use too
         self._datarow_strings = datarow_strings
+        self._datarows = None
         self.name = name
         self.unit = unit
         self.row_format = row_format
+        # populated by HeaderMatcher.annotate()
+        self.matcher = None
+        self.header_hits = frozenset()
+        # populated by TableIndex.annotate()
+        self.position = None
+        self.index = None
 
     @property
     def datarows(self):
-        return [[x for x in row.split('\t')] for row in self._datarow_strings]
+        if self._datarows is None:
+            self._datarows = tokenize(self._datarow_strings)
+            # drop reference to RowBlock and file buffer behind it
+            self._datarow_strings = None
+        return self._datarows
+
+    @property
+    def datarow_strings(self):
+        if self._datarow_strings is None:
+            return ['\t'.join(row) for row in self._datarows]
+        return list(self._datarow_strings)
 
     def __eq__(self, x):
-        return self.__dict__ == x.__dict__
+        return (self.datarow_strings == x.datarow_strings and
+                without_rows(self) == without_rows(x))
 
     def __bool__(self):
         return (self.name is not None) and (self.unit is not None)
@@ -118,33 +282,92 @@ class Table:
         return make_label(self.name, self.unit)
 
     def contains_any(self, strings):
-        """Return largest string found in table headers."""
-        for header in self.headers:
-            for s in strings:
-                if re.search(r'\b{}'.format(s), header):
-                    return s
+        """Return first of *strings* found in table headers."""
+        for s in strings:
+            if self.matcher and s in self.matcher.strings:
+                found = s in self.header_hits
+            else:
+                pattern = header_pattern(s)
+                found, n = False, 0
+                for header in self.headers:
+                    n += 1
+                    if pattern.search(header):
+                        found = True
+                        break
+                metrics.count('regex_evaluations', n)
+            if found:
+                return s
         return ''
 
+    def emit_columns(self, columns=None):
+        """Add values from table to *columns*, see row.emit_block()."""
+        if self.row_format is None:
+            self.row_format = get_row_format(self.datarows)
+        return emit_block(self.datarows, self.row_format, columns)
+
     def emit_datapoints(self):
         """Yield Datapoint() instances from table."""
-        rows = self.datarows
-        label = self.label
-        if self.row_format is None:
-            self.row_format = get_row_format(rows)
-        for row in self.datarows:
-            for d in emit_datapoints(row, label, self.row_format):
-                yield d
+        return iter(as_datapoints(self.label, self.emit_columns()))
 
     def __repr__(self):
         items = ['Table(name=%r' % self.name,
                  'unit=%r' % self.unit,
                  'row_format=%r' % self.row_format,
                  'header_strings=%s' % pprint.pformat(self.headers),
-                 'datarow_strings=%s)' % pprint.pformat(self._datarow_strings)
+                 'datarow_strings=%s)' % pprint.pformat(self.datarow_strings)
                  ]
         return ',\n      '.join(items)
 
 
+def without_rows(table):
+    return {k: v for k, v in table.__dict__.items()
+            if k not in ('_datarows', '_datarow_strings')}
+
+
+def header_pattern(string: str):
+    return re.compile(r'\b{}'.format(string))
+
+
+RE_SPECIAL = re.compile(r'[\\^$*+?{}\[\]|()]')
+
+
+def literal_part(string: str):
+    """Return longest plain substring that must be present in text
+       matched by *string* regex, or None if not sure.
+    """
+    if RE_SPECIAL.search(string):
+        return None
+    return max(string.split('.'), key=len)
+
+
+class HeaderMatcher:
+    """Match table headers against a fixed set of strings.
+
+       Patterns are compiled once, every table is scanned once in
+       annotate() and Table.contains_any() looks up the hits afterwards.
+    """
+
+    def __init__(self, strings):
+        self.strings = frozenset(strings)
+        # keep order, drop duplicates
+        self.patterns = [(s, literal_part(s), header_pattern(s))
+                         for s in dict.fromkeys(strings)]
+
+    def hits(self, headers):
+        text = '\n'.join(headers)
+        # fast substring check first, regex only if substring is present
+        candidates = [(s, pat) for s, literal, pat in self.patterns
+                      if literal is None or literal in text]
+        metrics.count('regex_evaluations', len(candidates))
+        return frozenset(s for s, pat in candidates if pat.search(text))
+
+    def annotate(self, tables):
+        for t in tables:
+            t.matcher = self
+            t.header_hits = self.hits(t.headers)
+        return tables
+
+
 def make_label(name: str, unit: str)-> str:
     """Concat variable name and unit.
 
@@ -1,11 +1,16 @@
 ﻿from collections import namedtuple
-from kep.engine.filters import is_omission, clean_year, clean_value
+from functools import lru_cache
+from kep.engine.filters import OMISSIONS, clean_year, clean_value
 
-__all__ = ['Datapoint', 'emit_datapoints']
+__all__ = ['Datapoint', 'emit_datapoints', 'emit_block', 'as_datapoints',
+           'FREQUENCIES']
 
 
 Datapoint = namedtuple('Datapoint', 'label freq year month value')
 
+# frequency codes in columns made by emit_block()
+FREQUENCIES = ('a', 'q', 'm')
+
 
 ROW_FORMAT_DICT = {len(x): x for x in [
     'YAQQQQMMMMMMMMMMMM',
@@ -21,7 +26,8 @@ ROW_FORMAT_DICT = {len(x): x for x in [
 
 
 def get_row_format(datarows: list):
-    """Return a format string like 'YAQQQQ'
+    """Return a format string like 'YAQQQQ' for *datarows*,
+       a list of tokenized rows.
     """
     _coln = coln(datarows)
     try:
@@ -33,7 +39,7 @@ def get_row_format(datarows: list):
 
 
 def coln(datarows):
-    return max([len(row) for row in datarows])
+    return max(len(row) for row in datarows)
 
 
 def get_month(freq: str, period: int):
@@ -44,6 +50,71 @@ def get_month(freq: str, period: int):
     return period
 
 
+@lru_cache(maxsize=None)
+def period_index(row_format: str):
+    """Precompute column positions for *row_format*.
+
+       Returns:
+         tuple of (position, freq, month) tuples, freq is None for year column
+    """
+    index = []
+    occurences = {}
+    for pos, letter in enumerate(row_format):
+        if letter == 'Y':
+            index.append((pos, None, None))
+        else:
+            occurences[letter] = occurences.get(letter, 0) + 1
+            freq = letter.lower()
+            index.append((pos, freq, get_month(freq, occurences[letter])))
+    return tuple(index)
+
+
+@lru_cache(maxsize=None)
+def code_index(row_format: str):
+    """Return tuple of (freq code, month) for every column of
+       *row_format*, freq code is None for year column."""
+    return tuple((None if freq is None else FREQUENCIES.index(freq), month)
+                 for _, freq, month in period_index(row_format))
+
+
+def emit_block(rows, row_format, columns=None):
+    """Collect datapoints from all *rows* of a table as columns.
+
+       Args:
+         rows(list): list of tokenized rows
+         row_format(str): format string like 'YAQQQQ'
+         columns(tuple): lists to extend, new lists if None
+
+       Returns:
+         tuple of lists (freq codes, years, months, values),
+         freq code is position in FREQUENCIES
+    """
+    if columns is None:
+        columns = [], [], [], []
+    freqs, years, months, values = columns
+    index = code_index(row_format)
+    for row in rows:
+        year = None
+        # columns over row format length are ignored
+        for (code, month), value in zip(index, row):
+            if code is None:
+                year = clean_year(value)
+            elif year and value not in OMISSIONS:
+                freqs.append(code)
+                years.append(year)
+                months.append(month)
+                values.append(clean_value(value))
+    return columns
+
+
+def as_datapoints(label, columns):
+    """Return list of Datapoint instances from *columns* made by
+       emit_block() for variable *label*."""
+    freqs, years, months, values = columns
+    return [Datapoint(label, FREQUENCIES[code], year, month, value)
+            for code, year, month, value in zip(freqs, years, months, values)]
+
+
 def emit_datapoints(row, label, row_format):
     """Yield Datapoint instances from *row*.
 
@@ -52,25 +123,7 @@ def emit_datapoints(row, label, row_format):
          label(str): variable identificator like 'CPI_rog'
          row_format(str): format string like 'YAQQQQ'
     """
-    occurences = ''
-    year = None
-    for value, letter in zip(row, row_format):
-        occurences += letter
-        if letter == 'Y':
-            year = clean_year(value)
-        elif year:
-            if is_omission(value):
-                continue
-            period = occurences.count(letter)
-            freq = letter.lower()
-            try:
-                yield Datapoint(label=label,
-                                freq=freq,
-                                year=year,
-                                month=get_month(freq, period),
-                                value=clean_value(value))
-            except UnboundLocalError:
-                raise ValueError((row, label))
+    yield from as_datapoints(label, emit_block([row], row_format))
 
 # WONTFIX
 # must fail on row
@@ -1,4 +1,8 @@
-from kep.engine.filters import clean_year, clean_value, is_omission
+import pytest
+
+from kep.engine.filters import (clean_year, clean_value, is_omission,
+                                clean_years, clean_values,
+                                clean_year_by_regex, clean_value_by_regex)
 
 
 def test_is_omission():
@@ -23,3 +27,38 @@ def test_clean_value():
     assert clean_value('211,32)') == 211.3
     assert clean_value('1001') == 1001
     assert clean_value('10.01') == 10.01
+
+
+SAMPLES = ['2015', '20052),3)', 'x2015', '12000', '19992', '2015 1)',
+           '1001)2)', '11)1)', '3.51)', '211,32)', '-44,4', ' 12 ',
+           '1e5', '1.', '.5', 'в т.ч. 2016', '40691']
+
+
+def test_clean_year_same_as_regex_version():
+    for x in SAMPLES:
+        assert clean_year(x) == clean_year_by_regex(x), x
+
+
+def test_clean_value_same_as_regex_version():
+    for x in SAMPLES:
+        try:
+            expected = clean_value_by_regex(x)
+        except ValueError:
+            with pytest.raises(ValueError):
+                clean_value(x)
+        else:
+            assert clean_value(x) == expected, x
+
+
+def test_column_functions_same_as_cell_functions():
+    assert clean_years(SAMPLES) == [clean_year(x) for x in SAMPLES]
+    numbers = []
+    for x in SAMPLES:
+        try:
+            clean_value(x)
+        except ValueError:
+            continue
+        numbers.append(x)
+    column = numbers + ['…', '-', '']
+    assert clean_values(column) == \
+        [clean_value(x) for x in numbers] + [None, None, None]
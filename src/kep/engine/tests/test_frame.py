@@ -0,0 +1,56 @@
+from kep.engine.frame import DatapointFrame
+from kep.engine.parser import parse_tables, datapoints
+from kep.engine.reader import read_tables
+from kep.engine.row import Datapoint
+from kep.engine.tests.test_parser import (CSV_TEXT, common_dicts,
+                                          segment_dicts, units_dict)
+from kep.utilities import TempFile
+
+A = Datapoint(label='INDPRO_yoy', freq='a', year=2015, month=12, value=99.2)
+Q = Datapoint(label='INDPRO_rog', freq='q', year=2015, month=3, value=82.8)
+M = Datapoint(label='INDPRO_yoy', freq='m', year=2015, month=1, value=100.0)
+FRAME = DatapointFrame.from_datapoints([M, A, Q])
+
+
+def test_DatapointFrame_iterates_as_datapoints():
+    assert list(FRAME) == [M, A, Q]
+    assert len(FRAME) == 3
+    assert FRAME.labels == ['INDPRO_rog', 'INDPRO_yoy']
+
+
+def test_DatapointFrame_membership():
+    assert A in FRAME
+    assert A._replace(value=0) not in FRAME
+    assert A._replace(label='GDP_yoy') not in FRAME
+
+
+def test_DatapointFrame_by_frequency():
+    groups = FRAME.by_frequency()
+    assert list(groups['a']) == [A]
+    assert list(groups['q']) == [Q]
+    assert list(groups['m']) == [M]
+    assert list(FRAME.subset('m')) == [M]
+
+
+def test_DatapointFrame_concat():
+    other = DatapointFrame.from_datapoints(
+        [A._replace(label='GDP_yoy', year=2016)])
+    joined = DatapointFrame.concat([FRAME, other])
+    assert list(joined) == [M, A, Q, A._replace(label='GDP_yoy', year=2016)]
+
+
+def test_DatapointFrame_to_dataframe():
+    df = FRAME.to_dataframe()
+    assert list(df.columns) == ['label', 'freq', 'year', 'month', 'value']
+    assert df.value.tolist() == [100.0, 99.2, 82.8]
+    assert df.label.tolist() == ['INDPRO_yoy', 'INDPRO_yoy', 'INDPRO_rog']
+
+
+def test_DatapointFrame_from_tables_same_as_datapoints():
+    with TempFile(CSV_TEXT) as path:
+        tables = parse_tables(read_tables(path), common_dicts,
+                              segment_dicts, units_dict)
+    frame = DatapointFrame.from_tables(tables)
+    expected = DatapointFrame.from_datapoints(datapoints(tables))
+    assert list(frame) == list(expected)
+    assert frame.labels == expected.labels
@@ -0,0 +1,45 @@
+from copy import deepcopy
+
+from kep.engine.incremental import Reparser, changed_documents
+from kep.engine.parser import datapoints, labels, parse_tables
+from kep.engine.reader import read_tables
+from kep.engine.tests.test_parser import (CSV_TEXT, common_dicts,
+                                          segment_dicts, units_dict)
+from kep.utilities import TempFile
+
+
+def read():
+    with TempFile(CSV_TEXT) as path:
+        return read_tables(path)
+
+
+def edited_segment_dicts():
+    dicts = deepcopy(segment_dicts)
+    dicts[0]['commands'][0]['units'] = 'yoy'
+    return dicts
+
+
+def test_Reparser_gives_same_result_as_parse_tables():
+    expected = datapoints(parse_tables(read(), common_dicts, segment_dicts,
+                                       units_dict))
+    r = Reparser(read(), units_dict)
+    assert r.datapoints(r.parse(common_dicts, segment_dicts)) == expected
+    # second run reuses all datapoints
+    assert r.datapoints(r.parse(common_dicts, segment_dicts)) == expected
+    assert r.reused == 5
+
+
+def test_Reparser_after_edit():
+    new_segment_dicts = edited_segment_dicts()
+    expected_tables = parse_tables(read(), common_dicts, new_segment_dicts,
+                                   units_dict)
+    r = Reparser(read(), units_dict)
+    r.datapoints(r.parse(common_dicts, segment_dicts))
+    tables = r.parse(common_dicts, new_segment_dicts)
+    assert labels(tables) == labels(expected_tables)
+    assert r.datapoints(tables) == datapoints(expected_tables)
+    assert r.reused == 4
+    changed = changed_documents(segment_dicts, new_segment_dicts)
+    assert len(changed) == 2
+    assert r.affected_labels(changed) == {'CPI_NONFOOD_rog',
+                                          'CPI_NONFOOD_yoy'}
@@ -0,0 +1,84 @@
+from kep.utilities import TempFile
+
+from kep.engine.reader import Table, HeaderMatcher
+from kep.engine.layout import (TableIndex, section_numbers,
+                               load_index, save_index)
+from kep.engine.parser import trim_start, trim_end, find, first_match
+
+HEADERS = [['1.2. Индекс промышленного производства'],
+           ['в % к предыдущему периоду'],
+           ['3.5. Индекс потребительских цен'],
+           ['продукты питания'],
+           ['4. Внешняя торговля']]
+STRINGS = ['Индекс промышленного', 'Индекс потребительских',
+           'продукты питания', 'Внешняя торговля', 'отсутствует']
+
+
+def make_tables():
+    return [Table(header_strings=h, datarow_strings=['2001\t300'])
+            for h in HEADERS]
+
+
+def indexed_tables():
+    tables = make_tables()
+    matcher = HeaderMatcher(STRINGS)
+    TableIndex.build(tables, matcher).annotate(tables, matcher)
+    return tables
+
+
+def test_section_numbers():
+    assert section_numbers(['3.5. Индекс цен', '\tГод', '10. Цены']) == \
+        ['3.5.', '10.']
+
+
+def test_TableIndex_positions_and_sections():
+    index = TableIndex.build(make_tables(), HeaderMatcher(STRINGS))
+    assert index.positions['Индекс потребительских'] == [2]
+    assert index.positions['отсутствует'] == []
+    assert index.section('3.5.') == [2]
+    assert index.first(['продукты питания', 'Внешняя торговля'], 1) == 3
+    assert index.first(['Индекс промышленного'], 1) is None
+
+
+def headers(tables):
+    return [t.headers for t in tables]
+
+
+def test_segment_functions_same_with_and_without_index():
+    for strings in (['Индекс потребительских'], ['отсутствует'],
+                    ['Внешняя торговля', 'продукты питания']):
+        tables = indexed_tables()
+        plain = make_tables()
+        assert headers(trim_start(tables, strings)) == \
+            headers(trim_start(plain, strings))
+        assert headers(trim_end(tables[1:], strings)) == \
+            headers(trim_end(plain[1:], strings))
+        assert (find(tables[1:], strings[0]) is None) == \
+            (find(plain[1:], strings[0]) is None)
+
+
+def test_first_match_on_unknown_string_reads_headers():
+    tables = indexed_tables()
+    assert first_match(tables[1:], ['питания']) == 2
+
+
+def test_index_saved_and_outdated():
+    tables = make_tables()
+    index = TableIndex.build(tables, HeaderMatcher(STRINGS))
+    with TempFile(content='abc') as csv_path, \
+            TempFile(content='') as path:
+        save_index(index, path, csv_path, STRINGS)
+        assert load_index(path, csv_path, STRINGS).positions == \
+            index.positions
+        assert load_index(path, csv_path, STRINGS[1:]) is None
+        with open(csv_path, 'a') as f:
+            f.write('def')
+        assert load_index(path, csv_path, STRINGS) is None
+
+
+def test_index_from_newer_pickle_protocol_is_outdated(tmpdir):
+    path = tmpdir.join('tab.index')
+    # pickle of unknown protocol version 99
+    path.write_binary(b'\x80\x63.')
+    with TempFile(content='abc') as csv_path:
+        assert load_index(str(path), csv_path, STRINGS) is None
@@ -1,4 +1,4 @@
-from kep.engine.parser import extract_unit, iterate
+from kep.engine.parser import extract_unit, iterate, UnitIndex
 import pytest
 
 
@@ -17,6 +17,15 @@ def test_extract_unit(unit, text):
     assert unit == extract_unit(text, units_dict)
 
 
+def test_UnitIndex_finds_longest_pattern_and_caches_it():
+    index = UnitIndex({'% к пред. периоду': 'rog',
+                       '% к пред. периоду прошлого года': 'yoy'})
+    text = 'abc, % к пред. периоду прошлого года'
+    assert index.find(text) == 'yoy'
+    assert index.cache[text] == 'yoy'
+    assert index.find('abc') == ''
+
+
 def test_iterate():
     assert iterate('abc') == ['abc']
 
@@ -1,5 +1,10 @@
 from kep.utilities import TempFile
-from kep.engine.reader import read_tables, read_csv, Table, split_csv
+import pytest
+
+from kep.engine.reader import (read_tables, iter_tables, read_csv,
+                              Table, split_csv, HeaderMatcher, literal_part,
+                              classify, split_bytes, release_rows,
+                              iter_split_classified)
 
 DOC = ("заголовок1 header1\t\t\t\n"
        "заголовок2 header2\t\t\t\n"
@@ -78,4 +83,68 @@ def test_read_csv_from_string():
         rows = list(read_csv(f))
         assert rows == CSV
 
+
+@pytest.mark.parametrize('content', [
+    DOC,
+    DOC.rstrip('\n'),
+    '\n\nЁЖ 2015\nIV\t1\nё\t2\n_\n\ufeff1999\t1\r\n',
+    'ЁЖ 2015\nIV\t1\nё\t2\nя\tа\n',
+    ''])
+def test_iter_tables_same_as_split_of_classified_rows(content):
+    with TempFile(content) as f:
+        expected = [Table(**td) for td in
+                    iter_split_classified(classify(read_csv(f)))]
+        assert list(iter_tables(f)) == expected
+
 # FIXME: add Table class tests
+
+
+def test_iter_tables_yields_tables_one_by_one():
+    with TempFile(content=DOC) as filename:
+        gen = iter_tables(filename)
+        assert next(gen) == TABLE_1
+        assert next(gen) == TABLE_2
+        assert list(gen) == []
+
+
+def test_release_rows_keeps_rows_and_drops_file_buffer():
+    with TempFile(content=DOC) as filename:
+        tables = read_tables(filename)
+        expected = [t.datarow_strings for t in tables]
+        release_rows(tables)
+        assert [t.datarow_strings for t in tables] == expected
+        assert all(t._datarow_strings is None for t in tables)
+
+
+def test_split_bytes_same_as_split_of_classified_rows():
+    buf = DOC.encode('utf-8')
+    expected = list(iter_split_classified(classify(CSV)))
+    tables = list(split_bytes(buf))
+    assert [t['header_strings'] for t in tables] == \
+        [t['header_strings'] for t in expected]
+    assert [list(t['datarow_strings']) for t in tables] == \
+        [t['datarow_strings'] for t in expected]
+
+
+def test_Table_datarows_are_tokenized_once():
+    assert TABLE_1.datarows == [('1999', '100', '100', '100', '100'),
+                                ('2000', '120', '120', '120', '120')]
+    assert TABLE_1.datarows is TABLE_1.datarows
+    assert TABLE_2.datarow_strings == ['2001\t300\t300\t300\t300']
+
+
+def test_literal_part():
+    assert literal_part('3.5. Индекс цен') == ' Индекс цен'
+    assert literal_part('abc (def)') is None
+
+
+def test_HeaderMatcher_annotates_tables():
+    table = Table(header_strings=['1.2. Индекс цен / Price index'],
+                  datarow_strings=['2001\t300'])
+    HeaderMatcher(['1.2. Индекс', 'Price', 'цен производителей']
+                  ).annotate([table])
+    assert table.header_hits == {'1.2. Индекс', 'Price'}
+    assert table.contains_any(['цен производителей', 'Price']) == 'Price'
+    assert table.contains_any(['цен производителей']) == ''
+    # string not known to matcher is searched directly
+    assert table.contains_any(['index']) == 'index'
@@ -1,4 +1,5 @@
-﻿from kep.engine.row import Datapoint, emit_datapoints
+﻿from kep.engine.row import (Datapoint, emit_datapoints, emit_block,
+                            as_datapoints, period_index)
 
 row1 = ['2018',
         '100',
@@ -35,3 +36,26 @@ def test_emit_datapoints():
             month=2,
             value=101.5),
     ]
+
+
+def test_period_index():
+    assert period_index('YAQQQQ') == ((0, None, None),
+                                      (1, 'a', 12),
+                                      (2, 'q', 3),
+                                      (3, 'q', 6),
+                                      (4, 'q', 9),
+                                      (5, 'q', 12))
+
+
+def test_emit_block_same_as_emit_datapoints():
+    row2 = ['20192)', '…', '1,5', '-', '2,5', '3']
+    rows = [row1[:6], row2]
+    columns = emit_block(rows, 'YAQQQQ')
+    assert as_datapoints('X_rog', columns) == [
+        *emit_datapoints(row1[:6], 'X_rog', 'YAQQQQ'),
+        *emit_datapoints(row2, 'X_rog', 'YAQQQQ')]
+    freqs, years, months, values = columns
+    assert freqs == [0, 1, 1, 1, 1]
+    assert years == [2018, 2018, 2019, 2019, 2019]
+    assert months == [12, 3, 3, 9, 12]
+    assert values == [100, 101.9, 1.5, 2.5, 3]
@@ -1,4 +1,7 @@
-from kep.engine.validate import require_all, require_any
+import pytest
+
+from kep.engine.validate import (require_all, require_any, validate,
+                                 DatapointIndex, ValidationError)
 from kep.engine.row import Datapoint
 
 
@@ -52,3 +55,30 @@ def test_require_any():
                                   month=12,
                                   value=99.2)],
                        DATAPOINTS)
+
+
+def test_DatapointIndex_status():
+    index = DatapointIndex(DATAPOINTS)
+    x = DATAPOINTS[0]
+    assert index.status(x) == 'passed'
+    assert index.status(x._replace(value=x.value + 1e-12)) == 'passed'
+    assert index.status(x._replace(value=-1)) == 'failed'
+    assert index.status(x._replace(year=1990)) == 'missing'
+
+
+def test_validate_returns_report():
+    report = validate(DATAPOINTS, DATAPOINTS[-1:], [DATAPOINTS[:2]])
+    assert report.ok
+    assert len(report.passed) == 3
+    assert report.covered_labels == {'INDPRO_yoy', 'CPI_NONFOOD_rog'}
+    assert report.coverage == 2 / 5
+
+
+def test_validate_raises_error_on_missing_value():
+    missing = DATAPOINTS[0]._replace(year=1990)
+    with pytest.raises(ValidationError) as e:
+        validate(DATAPOINTS, [missing], [])
+    report = e.value.report
+    assert not report.ok
+    assert report.missing == [missing]
+    assert report.labels == {d.label for d in DATAPOINTS}
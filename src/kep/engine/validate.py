@@ -1,30 +1,147 @@
 """Check datapoints with control values."""
+import math
+
+__all__ = ['validate', 'ValidationError', 'DatapointIndex', 'Report']
+
+PASSED, FAILED, MISSING = 'passed', 'failed', 'missing'
 
 
 class ValidationError(Exception):
-    pass
+    """Validation failed, *report* is the Report of all checkpoints
+       when raised by validate()."""
+
+    def __init__(self, message, report=None):
+        super().__init__(message)
+        self.report = report
+
+
+def make_key(d):
+    return d.label, d.freq, d.year, d.month
+
+
+def is_close(x: float, y: float) -> bool:
+    return math.isclose(x, y, rel_tol=1e-9, abs_tol=1e-6)
+
+
+class DatapointIndex:
+    """Datapoint values hashed by (label, freq, year, month)."""
+
+    def __init__(self, datapoints):
+        self.values = {}
+        for d in datapoints:
+            self.values.setdefault(make_key(d), []).append(d.value)
+        self.labels = set(label for label, _, _, _ in self.values)
+
+    def status(self, checkpoint):
+        """Return 'passed', 'failed' (value differs) or 'missing'."""
+        try:
+            values = self.values[make_key(checkpoint)]
+        except KeyError:
+            return MISSING
+        if any(is_close(v, checkpoint.value) for v in values):
+            return PASSED
+        return FAILED
+
+    def __contains__(self, checkpoint):
+        return self.status(checkpoint) == PASSED
+
+
+def as_index(datapoints):
+    if isinstance(datapoints, DatapointIndex):
+        return datapoints
+    return DatapointIndex(datapoints)
 
 
 def require_any(checkpoints, datapoints):
-    found = [c for c in checkpoints if c in datapoints]
+    index = as_index(datapoints)
+    found = [c for c in checkpoints if c in index]
     if not found:
         raise ValidationError(f'Found none of: {checkpoints}')
     return found
 
 
 def require_all(checkpoints, datapoints):
+    index = as_index(datapoints)
     for x in checkpoints:
-        if x not in datapoints:
+        if x not in index:
             raise ValidationError(f'Required value not found: {x}')
     return checkpoints
 
 
+class Report:
+    """Result of validation.
+
+    Attributes:
+        passed, failed, missing - lists of checkpoints
+        unmet_groups - optional checkpoint lists with no value passed
+        covered_labels - labels that have at least one checkpoint
+        labels - all labels in datapoints
+    """
+
+    def __init__(self):
+        self.passed = []
+        self.failed = []
+        self.missing = []
+        self.unmet_groups = []
+        self.mandatory_errors = []
+        self.covered_labels = set()
+        self.labels = set()
+
+    @property
+    def ok(self):
+        return not self.mandatory_errors and not self.unmet_groups
+
+    @property
+    def coverage(self):
+        """Share of time series in datapoints covered by checkpoints."""
+        if not self.labels:
+            return 0.0
+        return len(self.covered_labels) / len(self.labels)
+
+    def __str__(self):
+        return (f'Checkpoints: {len(self.passed)} passed, '
+                f'{len(self.failed)} failed, {len(self.missing)} missing; '
+                f'{len(self.covered_labels)} of {len(self.labels)} '
+                'time series covered by checkpoints')
+
+    def errors(self):
+        msgs = [f'Required value not found: {x}'
+                for x in self.mandatory_errors]
+        msgs.extend(f'Found none of: {group}' for group in self.unmet_groups)
+        return msgs
+
+
+def check(index, checkpoints, report):
+    """Check *checkpoints* against *index*, add results to *report*."""
+    results = []
+    for c in checkpoints:
+        result = index.status(c)
+        getattr(report, result).append(c)
+        results.append(result)
+        if c.label in index.labels:
+            report.covered_labels.add(c.label)
+    return results
+
+
 def validate(datapoints, checkpoints, optional_lists):
-    """Check datapoints with control values found in YAML file at *filepath*.
-       Raise ValidationError on error.
+    """Check datapoints with mandatory *checkpoints* and *optional_lists*
+       of checkpoints, at least one checkpoint in each list must be found.
+
+       Raise ValidationError on error, report is available as
+       its *report* attribute.
+
+       Returns:
+           Report instance
     """
-    require_all(checkpoints, datapoints)
-    for _checkpoints in optional_lists:
-        require_any(_checkpoints, datapoints)
-    # TODO: show how many of time series are covered
-    print("All values checked")
+    index = as_index(datapoints)
+    report = Report()
+    report.labels = set(index.labels)
+    for c, result in zip(checkpoints, check(index, checkpoints, report)):
+        if result != PASSED:
+            report.mandatory_errors.append(c)
+    for group in optional_lists:
+        if PASSED not in check(index, group, report):
+            report.unmet_groups.append(group)
+    if not report.ok:
+        raise ValidationError('\n'.join(report.errors()), report)
+    return report
@@ -1,3 +1,11 @@
-from .download import download
-from .unpack import unpack
-from .word import folder_to_csv
+import platform
+
+from .download import download, download_many, make_url
+from .unpack import unpack, unpack_many
+from . import word, openxml
+
+# MS Word on Windows, .docx XML (and LibreOffice for .doc) elsewhere
+if platform.system() == 'Windows':
+    folder_to_csv = word.folder_to_csv
+else:
+    folder_to_csv = openxml.folder_to_csv
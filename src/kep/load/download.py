@@ -1,20 +1,118 @@
 """Download and unpack Word files from Rosstat web site."""
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+import hashlib
+import os
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 
-__all__ = ['download']
+__all__ = ['download', 'download_many', 'make_session', 'make_url']
 
+CHUNK_SIZE = 1024 * 1024
+TIMEOUT = 60
+RETRIES = 3
+WORKERS = 4
 
-def _download(url, path):
-    """Download *url* to *path*."""
-    r = requests.get(url.strip(), stream=True)
-    with open(str(path), 'wb') as f:
-        for chunk in r.iter_content(chunk_size=1024):
-            # filter out keep-alive new chunks
-            if chunk:
-                f.write(chunk)
+
+def make_session(pool_size=WORKERS):
+    """Return requests.Session that keeps up to *pool_size* connections
+       per host alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def part_path(path):
+    return Path(str(path) + '.part')
+
+
+def checksum_path(path):
+    return Path(str(path) + '.sha256')
+
+
+def sha256(path) -> str:
+    h = hashlib.sha256()
+    with open(str(path), 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def write_checksum(path):
+    """Save sha256 of *path* next to it in sha256sum format."""
+    digest = sha256(path)
+    checksum_path(path).write_text(f'{digest}  {Path(path).name}\n')
+    return digest
+
+
+def _fetch(url, part, session):
+    """Download *url* to *part* file, continue from its current size."""
+    offset = part.stat().st_size if part.exists() else 0
+    headers = {'Range': f'bytes={offset}-'} if offset else {}
+    with session.get(url, headers=headers, stream=True,
+                     timeout=TIMEOUT) as r:
+        if r.status_code == 416:
+            # range not satisfiable, start again
+            part.unlink()
+            return _fetch(url, part, session)
+        r.raise_for_status()
+        # server may ignore Range and send whole file
+        mode = 'ab' if r.status_code == 206 else 'wb'
+        received = 0
+        with open(str(part), mode) as f:
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                # filter out keep-alive new chunks
+                if chunk:
+                    f.write(chunk)
+                    received += len(chunk)
+        check_length(r, received)
+
+
+def check_length(response, received: int):
+    """Raise ConnectionError if body is shorter than Content-Length."""
+    expected = response.headers.get('Content-Length')
+    # compressed body length differs from Content-Length
+    if expected is None or response.headers.get('Content-Encoding'):
+        return
+    if received != int(expected):
+        raise requests.ConnectionError(
+            f'{response.url}: got {received} of {expected} bytes')
+
+
+def is_retryable(e) -> bool:
+    """Network errors and server errors are retried, client errors
+       like 404 are not."""
+    if isinstance(e, requests.HTTPError):
+        return e.response is None or e.response.status_code >= 500
+    return True
+
+
+def _download(url, path, session=None, retries=RETRIES):
+    """Download *url* to *path*, resuming partial download after
+       network errors. Saves sha256 checksum next to *path*.
+
+       Returns:
+           sha256 hex digest of downloaded file
+    """
+    session = session or make_session(1)
+    part = part_path(path)
+    for attempt in range(retries + 1):
+        try:
+            _fetch(url.strip(), part, session)
+            break
+        except requests.RequestException as e:
+            # connection dropped in the middle of body is
+            # ChunkedEncodingError, resumed like other network errors
+            if attempt == retries or not is_retryable(e):
+                raise
+            time.sleep(2 ** attempt)
+    os.replace(str(part), str(path))
+    return write_checksum(path)
 
 
 def make_url(year, month):
@@ -22,24 +120,41 @@ def make_url(year, month):
     return (f'http://www.gks.ru/free_doc/doc_{year}/Ind/ind{month}.rar')
 
 
-def download(year: int, month: int, filepath: str, force=False):
+def check_date(year, month):
     if date(year, month, 1) < date(2016, 12, 1):
         raise ValueError('No web files before 2016-12')
+
+
+def download(year: int, month: int, filepath: str, force=False,
+             session=None):
+    check_date(year, month)
     url = make_url(year, month)
     path = Path(filepath)
     if path.exists() and not force:
         return 'Already downloaded:\n    %s' % path
-    _download(url, path)
+    _download(url, path, session)
     return 'Downloaded %s' % path
 
-# TODO: convert to test
-# if __name__ == "__main__":  # pragma: no cover
-#    import tempfile
-#    import pytest
-#    with tempfile.NamedTemporaryFile() as f:
-#        path = f.name
-#    d = Downloader(2016, 12, path)
-#    assert d.url.startswith("http://www.gks.ru/free_doc/")
-#    assert d.run()
-#    assert Path(path).lstat().st_size > 1000
-#    Path(path).unlink()
+
+def download_many(jobs, workers=WORKERS, force=False):
+    """Download (url, filepath) pairs from *jobs* in *workers* threads
+       over one pooled session. Existing files are skipped unless *force*.
+
+       Returns:
+           dictionary like {filepath: sha256 digest or exception}
+    """
+    jobs = [(url, Path(filepath)) for url, filepath in jobs]
+    session = make_session(workers)
+
+    def run(url, path):
+        if path.exists() and not force:
+            return sha256(path)
+        try:
+            return _download(url, path, session)
+        except Exception as e:
+            return e
+
+    with session, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {str(path): pool.submit(run, url, path)
+                   for url, path in jobs}
+        return {path: future.result() for path, future in futures.items()}
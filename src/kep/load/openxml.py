@@ -0,0 +1,155 @@
+"""Get tables from .docx files without MS Word.
+
+Document XML is parsed in streaming fashion with *iterparse*, rows are
+yielded as soon as a table row is closed. .doc files are converted to
+.docx by LibreOffice, if it is installed.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+import pathlib
+import shutil
+import subprocess
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+
+from .word import filter_cell_contents, make_file_list, to_csv
+
+__all__ = ['folder_to_csv', 'iter_docx_rows', 'find_converter']
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+TABLE, ROW, CELL, PARAGRAPH = W + 'tbl', W + 'tr', W + 'tc', W + 'p'
+TEXT, TAB, BREAK, GRID_COLUMN = W + 't', W + 'tab', W + 'br', W + 'gridCol'
+
+# -------------------------------------------------------------------------------
+#
+#     .docx reader
+#
+# -------------------------------------------------------------------------------
+
+
+def iter_docx_rows(path):
+    """Yield rows of all tables in .docx file at *path*.
+
+    Cell text is cleaned like cells read by MS Word, rows are padded
+    with empty strings to table grid width. Text of nested tables
+    is part of enclosing cell.
+
+    Yields:
+        list of strings (row elements)
+    """
+    with zipfile.ZipFile(str(path)) as z, z.open('word/document.xml') as f:
+        yield from iter_xml_rows(f)
+
+
+def iter_xml_rows(source):
+    depth = 0  # table nesting level
+    width = 0
+    row, paragraphs, text = [], [], []
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            if tag == TABLE:
+                depth += 1
+                if depth == 1:
+                    width = 0
+            continue
+        if tag == TABLE:
+            depth -= 1
+        elif depth == 0:
+            # text outside tables
+            if tag == PARAGRAPH:
+                elem.clear()
+        elif tag == GRID_COLUMN and depth == 1:
+            width += 1
+        elif tag == TEXT:
+            text.append(elem.text or '')
+        elif tag == TAB:
+            text.append('\t')
+        elif tag == BREAK:
+            text.append('\x0b')
+        elif tag == PARAGRAPH:
+            paragraphs.append(''.join(text))
+            text = []
+        elif tag == CELL and depth == 1:
+            row.append(filter_cell_contents('\r'.join(paragraphs)))
+            paragraphs = []
+        elif tag == ROW and depth == 1:
+            yield row + [''] * (width - len(row))
+            row = []
+            elem.clear()
+
+
+# -------------------------------------------------------------------------------
+#
+#     .doc to .docx conversion
+#
+# -------------------------------------------------------------------------------
+
+
+def find_converter():
+    """Return path to LibreOffice executable or None."""
+    for name in ('soffice', 'libreoffice'):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def doc_to_docx(path, folder, profile=None):
+    """Convert .doc file at *path* to .docx file in *folder*.
+       LibreOffice user profile is taken from *profile* URL, if given.
+    """
+    converter = find_converter()
+    if converter is None:
+        raise FileNotFoundError('LibreOffice is needed to read %s' % path)
+    tokens = [converter, '--headless', '--convert-to', 'docx',
+              '--outdir', str(folder), str(path)]
+    if profile:
+        tokens.insert(1, '-env:UserInstallation=' + profile)
+    subprocess.check_call(tokens, stdout=subprocess.DEVNULL)
+    name = os.path.splitext(os.path.basename(path))[0] + '.docx'
+    return os.path.join(str(folder), name)
+
+
+def read_rows(path):
+    """Return list of rows from .docx or .doc file at *path*."""
+    if path.endswith('.docx'):
+        return list(iter_docx_rows(path))
+    # each process gets own LibreOffice profile to run in parallel
+    with tempfile.TemporaryDirectory() as folder:
+        profile = pathlib.Path(folder, 'profile').as_uri()
+        docx_path = doc_to_docx(path, folder, profile)
+        return list(iter_docx_rows(docx_path))
+
+
+# -------------------------------------------------------------------------------
+#
+#    Folder-level batch job
+#
+# -------------------------------------------------------------------------------
+
+
+def existing_files(folder):
+    """Files from make_file_list(), .docx preferred over .doc."""
+    result = []
+    for p in make_file_list(folder):
+        if os.path.exists(p + 'x'):
+            result.append(p + 'x')
+        elif os.path.exists(p):
+            result.append(p)
+        else:
+            print("File does not exist:", p)
+    return result
+
+
+def folder_to_csv(folder, csv_filepath, workers=None):
+    """Make single CSV file at *csv_filepath* based on all .doc or .docx
+       files in *folder*. Files are read in parallel."""
+    print("Folder:\n    ", folder)
+    file_list = existing_files(folder)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        tables = pool.map(read_rows, file_list)
+        to_csv((row for rows in tables for row in rows), csv_filepath)
+    return "Finished creating raw CSV file: {}".format(csv_filepath)
@@ -0,0 +1,59 @@
+import csv
+import zipfile
+
+from kep.load.openxml import iter_docx_rows, folder_to_csv
+
+DOCUMENT = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+<w:body>
+<w:p><w:r><w:t>Text outside table</w:t></w:r></w:p>
+<w:tbl>
+  <w:tblGrid><w:gridCol/><w:gridCol/><w:gridCol/></w:tblGrid>
+  <w:tr>
+    <w:tc><w:p><w:r><w:t>1.2. Индекс</w:t></w:r></w:p>
+          <w:p><w:r><w:t xml:space="preserve">  цен</w:t></w:r></w:p></w:tc>
+    <w:tc><w:tcPr><w:gridSpan w:val="2"/></w:tcPr>
+          <w:p><w:r><w:t>в % к</w:t><w:br/><w:t>“предыдущему”</w:t></w:r></w:p></w:tc>
+  </w:tr>
+  <w:tr>
+    <w:tc><w:tcPr><w:gridSpan w:val="2"/></w:tcPr>
+          <w:p><w:r><w:t>Год</w:t></w:r></w:p></w:tc>
+    <w:tc><w:p><w:r><w:t>III</w:t></w:r></w:p></w:tc>
+  </w:tr>
+  <w:tr>
+    <w:tc><w:p><w:r><w:t>2017</w:t></w:r></w:p></w:tc>
+    <w:tc><w:p><w:r><w:t>102,5</w:t></w:r></w:p></w:tc>
+    <w:tc><w:tbl><w:tblGrid><w:gridCol/></w:tblGrid>
+          <w:tr><w:tc><w:p><w:r><w:t>99,1</w:t></w:r></w:p></w:tc></w:tr>
+          </w:tbl><w:p/></w:tc>
+  </w:tr>
+</w:tbl>
+</w:body>
+</w:document>
+"""
+
+# like MS Word, cells after a spanned cell follow it directly and
+# empty strings pad the row to grid width at the end
+ROWS = [['1.2. Индекс цен', 'в % к "предыдущему"', ''],
+        ['Год', 'III', ''],
+        ['2017', '102,5', '99,1']]
+
+
+def make_docx(path):
+    with zipfile.ZipFile(str(path), 'w') as z:
+        z.writestr('word/document.xml', DOCUMENT)
+
+
+def test_iter_docx_rows(tmpdir):
+    path = tmpdir / 'tab.docx'
+    make_docx(path)
+    assert list(iter_docx_rows(path)) == ROWS
+
+
+def test_folder_to_csv(tmpdir):
+    for name in ['tab.docx', 'tab1.docx']:
+        make_docx(tmpdir / name)
+    csv_path = tmpdir / 'tab.csv'
+    folder_to_csv(str(tmpdir), str(csv_path), workers=2)
+    with open(str(csv_path), encoding='utf-8') as f:
+        assert list(csv.reader(f, delimiter='\t')) == ROWS * 2
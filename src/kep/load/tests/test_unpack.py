@@ -0,0 +1,71 @@
+import shutil
+
+import pytest
+
+from kep.config import DATA_ROOT
+from kep.load.unpack import (Member, parse_technical_listing, list_members,
+                             missing, wanted, has_all_docs, unpack, DOC_NAMES)
+
+RAW_FOLDER = DATA_ROOT / 'raw' / '2016' / '12'
+
+LISTING = """
+UNRAR 5.50 freeware      Copyright (c) 1993-2017 Alexander Roshal
+
+Archive: ind.rar
+Details: RAR 4
+
+        Name: tab1.doc
+        Type: File
+        Size: 2440192
+ Packed size: 192512
+       Ratio: 7%
+       mtime: 2016-12-23 10:57:34,000
+  Attributes: ..A....
+       CRC32: E80C8FF7
+     Host OS: Windows
+ Compression: RAR 3.0(v29) -m3 -md=4M
+
+        Name: SOD.doc
+        Type: File
+        Size: 85504
+       CRC32: 6C7DEA0F
+"""
+
+
+def test_parse_technical_listing():
+    assert parse_technical_listing(LISTING) == [
+        Member('tab1.doc', 2440192, 0xE80C8FF7),
+        Member('SOD.doc', 85504, 0x6C7DEA0F)]
+
+
+def test_wanted():
+    assert wanted('tab.doc')
+    assert wanted('tab4.doc')
+    assert not wanted('Titul.doc')
+
+
+def test_missing_checks_size_and_crc(tmpdir):
+    pytest.importorskip('rarfile')
+    members = list_members(RAW_FOLDER / 'ind.rar')
+    assert sorted(m.name for m in members) == [
+        'tab.doc', 'tab1.doc', 'tab2.doc', 'tab3.doc', 'tab4.doc']
+    for name in ['tab1.doc', 'tab2.doc', 'tab3.doc', 'tab4.doc']:
+        shutil.copy(str(RAW_FOLDER / name), str(tmpdir))
+    assert [m.name for m in missing(members, tmpdir, full=True)] == ['tab.doc']
+    with open(str(tmpdir / 'tab1.doc'), 'r+b') as f:
+        f.write(b'x')
+    assert [m.name for m in missing(members, tmpdir, full=True)] == [
+        'tab.doc', 'tab1.doc']
+
+
+def test_unpack_does_not_list_archive_when_all_files_exist(tmpdir):
+    # not a real archive, fails if listed
+    rar = tmpdir / 'download.rar'
+    rar.write_binary(b'')
+    folder = tmpdir.mkdir('docs')
+    for name in DOC_NAMES[1:]:
+        (folder / name).write_binary(b'')
+    assert not has_all_docs(folder)
+    (folder / DOC_NAMES[0]).write_binary(b'')
+    assert has_all_docs(folder)
+    assert unpack(str(rar), str(folder)).startswith('Already unpacked')
@@ -1,37 +1,205 @@
+"""Extract tab*.doc files from rar archive.
+
+Archive members are read with *rarfile* library, if installed,
+otherwise with UnRAR executable. Only files from
+word.make_file_list() are extracted, their sizes and CRC32 are
+checked against archive listing.
+"""
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import os
 import platform
 from pathlib import Path
+import shutil
 import subprocess
+import zlib
+
+from kep.utilities.tempfile import atomic_path
+from .word import make_file_list
 
-__all__ = ['unpack']
+__all__ = ['unpack', 'unpack_many', 'has_all_docs']
 
 IS_WINDOWS = platform.system() == 'Windows'
 UNRAR_EXE = (str(Path(__file__).parent / 'bin' / 'UnRAR.exe')
              if IS_WINDOWS
              else 'unrar')
+DOC_NAMES = [os.path.basename(p) for p in make_file_list('')]
+
+Member = namedtuple('Member', 'name size crc')
+
+
+def has_rarfile():
+    try:
+        import rarfile  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def wanted(name: str) -> bool:
+    return os.path.basename(name).lower() in DOC_NAMES
+
+# -------------------------------------------------------------------------------
+#
+#     Archive listing
+#
+# -------------------------------------------------------------------------------
+
+
+def _list_rarfile(filepath):
+    import rarfile
+    with rarfile.RarFile(str(filepath)) as rf:
+        return [Member(x.filename, x.file_size, x.CRC)
+                for x in rf.infolist() if not x.is_dir()]
+
+
+def parse_technical_listing(text: str):
+    """Parse output of 'unrar lt' to list of Member tuples."""
+    members = []
+    name = size = crc = None
+    for line in text.splitlines() + ['']:
+        key, _, value = line.strip().partition(': ')
+        if key == 'Name':
+            name = value
+        elif key == 'Size':
+            size = int(value)
+        elif key == 'CRC32':
+            crc = int(value, 16)
+        elif not line.strip() and name is not None:
+            if size is not None:
+                members.append(Member(name, size, crc))
+            name = size = crc = None
+    return members
+
+
+def _list_unrar(filepath, unrar_executable=UNRAR_EXE):
+    text = subprocess.check_output([unrar_executable, 'lt', str(filepath)],
+                                   universal_newlines=True)
+    return parse_technical_listing(text)
+
+
+def list_members(filepath):
+    """Return list of wanted archive members as Member tuples."""
+    if has_rarfile():
+        members = _list_rarfile(filepath)
+    else:
+        members = _list_unrar(filepath)
+    return [m for m in members if wanted(m.name)]
+
+# -------------------------------------------------------------------------------
+#
+#     Checks
+#
+# -------------------------------------------------------------------------------
+
 
+def crc32(path) -> int:
+    value = 0
+    with open(str(path), 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            value = zlib.crc32(chunk, value)
+    return value
 
-def _unrar(filepath: str, folder: str, unrar_executable=UNRAR_EXE):
-    """Unpack *filepath* to *folder*."""
+
+def target(folder, member):
+    return Path(folder) / os.path.basename(member.name)
+
+
+def check(member, folder, full=True):
+    """Return error message if *member* file in *folder* is missing or
+       differs from archive listing, else None. CRC is checked if *full*.
+    """
+    path = target(folder, member)
+    if not path.exists():
+        return f'{path} not found'
+    if path.stat().st_size != member.size:
+        return f'{path} size differs from archive'
+    if full and member.crc is not None and crc32(path) != member.crc:
+        return f'{path} CRC differs from archive'
+    return None
+
+
+def missing(members, folder, full=False):
+    """Members not found in *folder* or with different size (or CRC)."""
+    return [m for m in members if check(m, folder, full)]
+
+
+def has_all_docs(folder) -> bool:
+    """True if every file of word.make_file_list() is in *folder*."""
+    return all(os.path.exists(p) for p in make_file_list(str(folder)))
+
+# -------------------------------------------------------------------------------
+#
+#     Extraction
+#
+# -------------------------------------------------------------------------------
+
+
+def _extract_rarfile(filepath, folder, members):
+    """Stream *members* from archive to *folder*, rarfile checks CRC."""
+    import rarfile
+    with rarfile.RarFile(str(filepath)) as rf:
+        for member in members:
+            path = target(folder, member)
+            with rf.open(member.name) as src, atomic_path(path) as tmp:
+                with open(tmp, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def _unrar(filepath, folder, members, unrar_executable=UNRAR_EXE):
+    """Extract *members* from *filepath* to *folder* with UnRAR."""
     # UnRAR wants its folder argument with '/'
     folder = "{}{}".format(folder, os.sep)
-    tokens = [unrar_executable, 'e', str(filepath), folder, '-y']
-    try:
-        return subprocess.check_call(tokens)
-    except subprocess.CalledProcessError as e:
-        raise e
+    names = [m.name for m in members]
+    tokens = [unrar_executable, 'e', '-y', str(filepath), *names, folder]
+    return subprocess.check_call(tokens)
+
+
+def extract(filepath, folder, members):
+    if has_rarfile():
+        _extract_rarfile(filepath, folder, members)
+    else:
+        _unrar(filepath, folder, members)
+    errors = [check(m, folder) for m in members]
+    errors = [e for e in errors if e]
+    if errors:
+        raise IOError('Extraction failed: ' + '; '.join(errors))
 
 
 def unpack(filepath, destination_folder, force=False):
+    """Extract tab*.doc files from archive at *filepath* to
+       *destination_folder*. Files already extracted with right size
+       are skipped unless *force*. Archive is not listed if all files
+       are in place."""
     assert_exists(filepath)
     assert_exists(destination_folder)
-    docs = docs_listing(destination_folder)
-    if docs and not force:
-        return "Already unpacked: %r" % docs
-    res = _unrar(filepath, destination_folder)
-    if res == 0:
-        return "UnRARed to %s" % destination_folder
-    return 'UnRAR failed with code %s' % res
+    if not force and has_all_docs(destination_folder):
+        return "Already unpacked: %r" % docs_listing(destination_folder)
+    members = list_members(filepath)
+    todo = members if force else missing(members, destination_folder)
+    if not todo:
+        return "Already unpacked: %r" % docs_listing(destination_folder)
+    extract(filepath, destination_folder, todo)
+    return "Unpacked %s to %s" % (', '.join(m.name for m in todo),
+                                  destination_folder)
+
+
+def unpack_many(jobs, workers=4, force=False):
+    """Unpack (filepath, folder) pairs from *jobs* in *workers* threads.
+
+       Returns:
+           dictionary like {filepath: message or exception}
+    """
+    def run(filepath, folder):
+        try:
+            return unpack(filepath, folder, force)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {str(filepath): pool.submit(run, filepath, folder)
+                   for filepath, folder in jobs}
+        return {path: future.result() for path, future in futures.items()}
 
 
 def assert_exists(filepath):
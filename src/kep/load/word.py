@@ -1,5 +1,6 @@
 """Get data from MS Word files using *win32com.client*.
    Windows-only, requires MS Word installed.
+   See kep.load.openxml for reading files without MS Word.
 """
 
 # More info on...
@@ -110,10 +111,8 @@ def cell_iter(table):
 
 def row_iter(table):
     for i in range(1, table.rows.count + 1):
-        row = []
-        for j in range(1, table.columns.count + 1):
-            row = row + [get_filtered_cell_value(table, i, j)]
-        yield row
+        yield [get_filtered_cell_value(table, i, j)
+               for j in range(1, table.columns.count + 1)]
 
 
 # -------------------------------------------------------------------------------
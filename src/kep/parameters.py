@@ -1,9 +1,19 @@
-"""Parsing parameters and checkpoints."""
+"""Parsing parameters and checkpoints.
+
+Parameters are read from YAML files on first attribute access,
+for example ParsingParameters.common_dicts. The result is saved to a
+compiled cache file and reused until YAML files or code change.
+"""
 from collections import OrderedDict
+import hashlib
+import os
 import pathlib
+import pickle
 import yaml
 
 from kep.engine.row import Datapoint
+from kep.engine.parser import make_matcher
+from kep.utilities.tempfile import atomic_path
 
 __all__ = ['ParsingParameters', 'CheckParameters']
 
@@ -19,6 +29,10 @@ def _read_source(filename: str):
     return pathlib.Path(filename).read_text(encoding='utf-8')
 
 
+# C loader is much faster, but requires PyYAML built with libyaml
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
 def load_yaml_list(filename: str):
     """Load YAML contents of *filename*.
 
@@ -26,7 +40,7 @@ def load_yaml_list(filename: str):
         list - each list element is a YAML document.
     """
     doc = _read_source(filename)
-    return list(yaml.load_all(doc))
+    return list(yaml.load_all(doc, Loader=YAML_LOADER))
 
 
 def load_yaml_one_document(filename: str):
@@ -98,6 +112,87 @@ def get_optional(filepath):
         anys.append(x)
     return anys
 
+
+# -----------------------------------------------------------------------------
+
+# compiled cache is readable by all supported Python versions
+PICKLE_PROTOCOL = 4
+
+# compiled values are made by this module and kep.engine classes
+CODE_FILES = [pathlib.Path(__file__),
+              *sorted((pathlib.Path(__file__).parent / 'engine').glob('*.py'))]
+
+
+def code_hash() -> str:
+    """Hash of source code that makes and defines compiled values."""
+    h = hashlib.sha1()
+    for path in CODE_FILES:
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def stamp(filepaths):
+    """Code hash, modification time and size of each file in
+       *filepaths*."""
+    result = [code_hash()]
+    for path in filepaths:
+        st = os.stat(path)
+        result.append((str(path), st.st_mtime_ns, st.st_size))
+    return result
+
+
+def compiled_path(name: str):
+    return pathlib.Path(__file__).parent / 'yaml' / '__pycache__' / (
+        name + '.pickle')
+
+
+def load_compiled(name: str, source_files, build):
+    """Return dictionary made by *build()* from *source_files*.
+       The dictionary is kept in a compiled cache file and rebuilt
+       if any of *source_files* or code in CODE_FILES changed.
+    """
+    path = compiled_path(name)
+    current_stamp = stamp(source_files)
+    try:
+        saved_stamp, values = pickle.loads(path.read_bytes())
+        if saved_stamp == current_stamp:
+            return values
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError,
+            AttributeError):
+        # no cache file or cannot read it
+        pass
+    values = build()
+    try:
+        path.parent.mkdir(exist_ok=True)
+        # other processes may read or write the same file
+        with atomic_path(path) as tmp:
+            with open(tmp, 'wb') as f:
+                pickle.dump((current_stamp, values), f,
+                            protocol=PICKLE_PROTOCOL)
+    except OSError:
+        pass
+    return values
+
+
+class LazyParameters:
+    """Parameters loaded on first attribute access."""
+
+    def __init__(self, name, source_files, build):
+        self.name = name
+        self.source_files = source_files
+        self.build = build
+
+    def __getattr__(self, attr):
+        # called only for attributes not loaded yet
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        values = load_compiled(self.name, self.source_files, self.build)
+        self.__dict__.update(values)
+        try:
+            return values[attr]
+        except KeyError:
+            raise AttributeError(attr)
+
 # -----------------------------------------------------------------------------
 
 
@@ -105,17 +200,28 @@ i = persist('instructions.yml')
 u = persist('base_units.yml')
 
 
-class ParsingParameters:
+def build_parsing_parameters():
     common_dicts = read_by_key(i, 'name')
     segment_dicts = read_by_key(i, 'start_with')
-    units_dict = get_mapper(u)
+    return dict(common_dicts=common_dicts,
+                segment_dicts=segment_dicts,
+                units_dict=get_mapper(u),
+                header_matcher=make_matcher(common_dicts, segment_dicts))
+
+
+# parsing result depends on *source_files*
+ParsingParameters = LazyParameters('parsing', (i, u),
+                                   build_parsing_parameters)
 
 
 c = persist('checkpoints.yml')
 g = persist('groups.yml')
 
 
-class CheckParameters:
-    group_dict = get_groups(g)
-    mandatory_list = get_mandatory(c)
-    optional_lists = get_optional(c)
+def build_check_parameters():
+    return dict(group_dict=get_groups(g),
+                mandatory_list=get_mandatory(c),
+                optional_lists=get_optional(c))
+
+
+CheckParameters = LazyParameters('check', (c, g), build_check_parameters)
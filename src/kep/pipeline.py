@@ -0,0 +1,244 @@
+"""Update releases from Rosstat web site to processed files:
+
+   update(year, month)
+   update_range(start, end)
+
+Every month goes through STAGES in order: download rar file, unpack
+Word files, convert them to interim CSV file and parse it to processed
+files. Months run concurrently, each stage is limited to a few months
+at a time, so that month N is parsed while month N+1 downloads.
+Downloads and file stages run in threads, parsing runs in processes.
+
+Completed stages are recorded in a state file. On rerun a release
+continues after its last completed stage, whose output still exists.
+Releases not in state file (like older months kept in repository)
+continue after the last stage with existing output.
+"""
+
+__all__ = ['update', 'update_range', 'PipelineState', 'STAGES']
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import datetime
+import json
+import os
+
+import kep.load
+from kep.load.download import make_session
+from kep.load.unpack import has_all_docs
+import kep.commands
+import kep.utilities.locations as loc
+from kep.utilities.dates import date_span
+from kep.utilities.tempfile import atomic_path
+
+STAGES = ['download', 'unpack', 'convert', 'parse']
+
+# number of months in a stage at the same time, None is number of CPUs
+LIMITS = {'download': 4, 'unpack': 2, 'convert': 1, 'parse': None}
+
+# stages run in a process pool, others run in threads
+PROCESS_STAGES = {'parse'}
+
+# -----------------------------------------------------------------------------
+#
+#    Stages
+#
+# -----------------------------------------------------------------------------
+
+
+def download(year: int, month: int, session=None):
+    filepath = loc.rarfile(year, month)
+    return kep.load.download(year, month, filepath, session=session)
+
+
+def unpack(year: int, month: int, session=None):
+    return kep.load.unpack(loc.rarfile(year, month),
+                           loc.raw_folder(year, month))
+
+
+def convert(year: int, month: int, session=None):
+    path = loc.interim_csv(year, month)
+    # do not leave partial CSV file if conversion fails
+    with atomic_path(path) as tmp:
+        kep.load.folder_to_csv(loc.raw_folder(year, month), tmp)
+    return f'Saved {path}'
+
+
+def parse(year: int, month: int, session=None):
+    return kep.commands.rebuild_one(year, month)
+
+
+STAGE_FUNCTIONS = dict(download=download, unpack=unpack,
+                       convert=convert, parse=parse)
+
+
+def output_exists(stage: str, year: int, month: int) -> bool:
+    if stage == 'download':
+        return os.path.exists(loc.rarfile(year, month))
+    if stage == 'unpack':
+        # some files may be missing after interrupted extraction
+        return has_all_docs(loc.raw_folder(year, month))
+    if stage == 'convert':
+        path = loc.interim_csv(year, month)
+        return os.path.exists(path) and os.path.getsize(path) > 0
+    if stage == 'parse':
+        return all(os.path.exists(loc.processed_csv(year, month, freq))
+                   for freq in 'aqm')
+    raise ValueError(stage)
+
+# -----------------------------------------------------------------------------
+#
+#    Completed stages
+#
+# -----------------------------------------------------------------------------
+
+
+def release_key(year: int, month: int) -> str:
+    return f'{year}-{month:02d}'
+
+
+class PipelineState:
+    """Completed stages by release, kept in JSON file at *path* like
+       {'2018-06': {'download': '2018-07-20T10:15:01', ...}}.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.releases = json.load(f)
+        except FileNotFoundError:
+            self.releases = {}
+
+    def completed(self, year: int, month: int) -> dict:
+        return self.releases.get(release_key(year, month), {})
+
+    def mark(self, year: int, month: int, stage: str):
+        """Record *stage* and stages before it as completed."""
+        record = self.releases.setdefault(release_key(year, month), {})
+        now = datetime.datetime.now().isoformat(timespec='seconds')
+        for previous in STAGES[:STAGES.index(stage)]:
+            record.setdefault(previous, now)
+        record[stage] = now
+        self.save()
+
+    def save(self):
+        with atomic_path(self.path) as tmp:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.releases, f, indent=1, sort_keys=True)
+
+    def todo(self, year: int, month: int) -> list:
+        """Stages left after last completed stage with existing output."""
+        record = self.completed(year, month)
+        done = [(not record or stage in record)
+                and output_exists(stage, year, month)
+                for stage in STAGES]
+        if any(done):
+            last = max(i for i, x in enumerate(done) if x)
+            return STAGES[last + 1:]
+        return list(STAGES)
+
+# -----------------------------------------------------------------------------
+#
+#    Concurrent run
+#
+# -----------------------------------------------------------------------------
+
+
+class Pipeline:
+    """Run stages for many months in one event loop."""
+
+    def __init__(self, state, workers=None):
+        self.state = state
+        # semaphores are made in run(), on Python < 3.10 they are bound
+        # to event loop at creation
+        self.limits = {}
+        thread_count = sum(n or 1 for stage, n in LIMITS.items()
+                           if stage not in PROCESS_STAGES)
+        self.threads = ThreadPoolExecutor(max_workers=thread_count)
+        self.processes = None
+        if PROCESS_STAGES:
+            self.processes = ProcessPoolExecutor(max_workers=workers)
+        self.session = make_session(LIMITS['download'])
+        self.failures = {}
+
+    def close(self):
+        self.threads.shutdown()
+        if self.processes:
+            self.processes.shutdown()
+        self.session.close()
+
+    async def run_stage(self, stage: str, year: int, month: int):
+        # same as get_running_loop() in a coroutine, works on Python 3.6
+        loop = asyncio.get_event_loop()
+        func = STAGE_FUNCTIONS[stage]
+        async with self.limits[stage]:
+            if stage in PROCESS_STAGES:
+                # session cannot be passed to other process
+                return await loop.run_in_executor(self.processes, func,
+                                                  year, month)
+            return await loop.run_in_executor(self.threads, func,
+                                              year, month, self.session)
+
+    async def update(self, year: int, month: int) -> bool:
+        """Run remaining stages for one month, return True on success."""
+        for stage in self.state.todo(year, month):
+            try:
+                msg = await self.run_stage(stage, year, month)
+            except Exception as e:
+                self.failures[(year, month)] = f'{stage}: {e!r}'
+                print(f'Failed {year}-{month:02d} {stage}: {e!r}')
+                return False
+            # state is changed in event loop thread only
+            self.state.mark(year, month, stage)
+            print(f'{year}-{month:02d} {stage}: {msg}')
+        return True
+
+    async def run(self, dates) -> dict:
+        self.limits = {stage: asyncio.Semaphore(n or os.cpu_count() or 1)
+                       for stage, n in LIMITS.items()}
+        results = await asyncio.gather(*[self.update(year, month)
+                                         for year, month in dates])
+        return dict(zip(dates, results))
+
+
+def run_until_complete(coroutine):
+    """Run *coroutine* in new event loop, like asyncio.run()
+       on Python 3.7+."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def update_range(start: str, end: str, workers=None, publish=True):
+    """Download, unpack, convert and parse months from *start* to *end*
+       (like '2018-01'), skipping completed stages. Latest folder and
+       Excel file are updated to last month in range, if it is parsed
+       and *publish* is True.
+
+       Returns:
+           dictionary of failures like {(2018, 5): "download: HTTPError(...)"}
+    """
+    dates = date_span(start, end)
+    if not dates:
+        return {}
+    state = PipelineState(loc.pipeline_state())
+    pipeline = Pipeline(state, workers)
+    try:
+        results = run_until_complete(pipeline.run(dates))
+    finally:
+        pipeline.close()
+    year, month = dates[-1]
+    if publish and results[(year, month)]:
+        kep.commands.to_latest(year, month)
+        kep.commands.to_excel(year, month)
+    print(f'Updated {sum(results.values())} of {len(dates)} months')
+    return pipeline.failures
+
+
+def update(year: int, month: int, publish=True):
+    """Run update_range() for one month."""
+    date = f'{year}-{month:02d}'
+    return update_range(date, date, publish=publish)
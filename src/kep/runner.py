@@ -2,17 +2,27 @@
 import random
 from profilehooks import profile
 
-from kep.engine import read_tables, parse_tables, datapoints, validate
+from kep.engine import iter_tables, parse_tables, validate
+from kep.engine.parser import labels, parse_annotated, unit_index
+from kep.engine.reader import release_rows
+from kep.engine.layout import (TableIndex, HeaderCache,
+                               load_index, save_index)
+from kep.engine.incremental import Reparser, changed_documents
+from kep.engine.frame import DatapointFrame
 from kep.dataframe import unpack_dataframes
 from kep.parameters import ParsingParameters, CheckParameters
-from kep.utilities.synopsis import print_reference
-from kep.utilities.locations import interim_csv
+from kep.cache import ParseCache, cache_key
+from kep.utilities.synopsis import print_labels
+from kep.utilities.locations import interim_csv, interim_index, cache_folder
 from kep.utilities.dates import date_span
+import kep.utilities.metrics as metrics
 
-__all__ = ['get_dataframes', 'get_dataframe_dict', 'run_sample']
+__all__ = ['get_dataframes', 'get_dataframe_dict', 'run_sample',
+           'extract_tables_many', 'ReparseSession']
 
 
 ALL_DATES = date_span('2009-04', '2018-06')
+CACHE = ParseCache(cache_folder())
 
 
 def random_date():
@@ -23,11 +33,73 @@ def random_dates(n):
     return [random_date() for _ in range(n)]
 
 
+def table_index(year, month, tables, matcher):
+    """Return TableIndex of *tables* saved next to interim CSV file,
+       build and save index if it is missing or outdated."""
+    path, csv_path = interim_index(year, month), interim_csv(year, month)
+    index = load_index(path, csv_path, matcher.strings)
+    if index is None or index.size != len(tables):
+        metrics.count('index_builds')
+        index = TableIndex.build(tables, matcher)
+        save_index(index, path, csv_path, matcher.strings)
+    return index
+
+
 def extract_tables(year, month):
     p = ParsingParameters
-    path = interim_csv(year, month)
-    tables = read_tables(path)
-    return parse_tables(tables, p.common_dicts, p.segment_dicts, p.units_dict)
+    with metrics.timer('stage', stage='read_tables'):
+        tables = list(iter_tables(interim_csv(year, month)))
+    index = table_index(year, month, tables, p.header_matcher)
+    return parse_tables(tables, p.common_dicts, p.segment_dicts, p.units_dict,
+                        p.header_matcher, index)
+
+
+def extract_tables_many(dates):
+    """Return dictionary of parsed tables by (year, month) for *dates*,
+       same tables as extract_tables() gives for each date.
+
+       Units and header matches are found once for every distinct set of
+       table headers, not once per month. Data rows are split only in
+       tables that got parsed, then parsed tables no longer refer to
+       memory-mapped CSV file, which is closed before next month.
+    """
+    p = ParsingParameters
+    headers = HeaderCache(unit_index(p.units_dict), p.header_matcher)
+    result = {}
+    for year, month in dates:
+        with metrics.labels(month=f'{year}-{month:02d}'):
+            with metrics.timer('stage', stage='read_tables'):
+                tables = list(iter_tables(interim_csv(year, month)))
+            with metrics.timer('stage', stage='apply_commands'):
+                headers.annotate(tables)
+                parsed_tables = parse_annotated(tables, p.common_dicts,
+                                                p.segment_dicts)
+            result[(year, month)] = release_rows(parsed_tables)
+    metrics.count('distinct_headers', len(headers.known))
+    return result
+
+
+def extract_datapoints(year, month, use_cache=True):
+    """Return DatapointFrame and (name, unit) labels by *year* and *month*.
+       Result is read from cache if interim CSV file and parsing
+       parameters did not change.
+    """
+    with metrics.labels(month=f'{year}-{month:02d}'):
+        key = cache_key(interim_csv(year, month),
+                        ParsingParameters.source_files)
+        if use_cache:
+            cached = CACHE.get(key)
+            if cached is not None:
+                metrics.count('cache_hits')
+                return cached
+            metrics.count('cache_misses')
+        tables = extract_tables(year, month)
+        with metrics.timer('stage', stage='datapoints'):
+            values = DatapointFrame.from_tables(tables)
+            metrics.count('datapoints_emitted', len(values))
+        label_list = labels(tables)
+        CACHE.put(key, values, label_list)
+        return values, label_list
 
 
 def get_dataframes(year, month):
@@ -35,12 +107,15 @@ def get_dataframes(year, month):
     Return a tuple of annual, quarterly and monthly dataframes by *year* and *month*.
     Prints parsing synopsis to stdout.
     """
-    tables = extract_tables(year, month)
-    values = datapoints(tables)
+    values, label_list = extract_datapoints(year, month)
     c = CheckParameters
-    print_reference(tables, c.group_dict)
-    validate(values, c.mandatory_list, c.optional_lists)
-    return unpack_dataframes(values)
+    print_labels(label_list, c.group_dict)
+    with metrics.labels(month=f'{year}-{month:02d}'):
+        with metrics.timer('stage', stage='validate'):
+            report = validate(values, c.mandatory_list, c.optional_lists)
+        print(report)
+        with metrics.timer('stage', stage='unpack_dataframes'):
+            return unpack_dataframes(values)
 
 
 def get_dataframe_dict(year, month):
@@ -49,6 +124,54 @@ def get_dataframe_dict(year, month):
     return {freq: df for freq, df in zip('aqm', _dataframes)}
 
 
+class ReparseSession:
+    """Keep tables for many months in memory to try edits of parsing
+       instructions without re-reading and re-parsing all of the files.
+
+       session = ReparseSession(dates)
+       # ... edit instructions.yml, reload dicts ...
+       affected_labels = session.update(common_dicts, segment_dicts)
+       dfa, dfq, dfm = session.get_dataframes(2018, 6)
+    """
+
+    def __init__(self, dates, common_dicts=None, segment_dicts=None):
+        p = ParsingParameters
+        self.common_dicts = common_dicts or p.common_dicts
+        self.segment_dicts = segment_dicts or p.segment_dicts
+        self.reparsers = {(year, month):
+                          Reparser(iter_tables(interim_csv(year, month)),
+                                   p.units_dict)
+                          for year, month in dates}
+        self.values = {}
+        self.labels = {}
+        self._parse()
+
+    def _parse(self):
+        for date, r in self.reparsers.items():
+            tables = r.parse(self.common_dicts, self.segment_dicts)
+            self.values[date] = r.datapoints(tables)
+            self.labels[date] = labels(tables)
+
+    def update(self, common_dicts, segment_dicts):
+        """Apply new instructions, return set of labels affected by edit."""
+        changed = changed_documents(self.common_dicts + self.segment_dicts,
+                                    common_dicts + segment_dicts)
+        self.common_dicts, self.segment_dicts = common_dicts, segment_dicts
+        if not changed:
+            return set()
+        self._parse()
+        affected = set()
+        for r in self.reparsers.values():
+            affected.update(r.affected_labels(changed))
+        return affected
+
+    def datapoints(self, year, month):
+        return self.values[(year, month)]
+
+    def get_dataframes(self, year, month):
+        return unpack_dataframes(self.datapoints(year, month))
+
+
 @profile(immediate=True, entries=20)
 def run_sample(n=3):
     """Run parsing for *n* random historic dates."""
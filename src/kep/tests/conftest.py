@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+import kep.runner
+import kep.utilities.locations as loc
+from kep.cache import ParseCache
+
+
+@pytest.fixture
+def tmp_outputs(tmpdir, monkeypatch):
+    """Write processed files, vintage store, pipeline state, parse cache
+       and table index to *tmpdir* instead of data folder.
+
+       Returns:
+           folder name
+    """
+    folder = str(tmpdir)
+
+    def processed(suffix):
+        def path(year, month, freq):
+            # suffix may be changed by test after fixture is set up
+            return os.path.join(folder, f'{year}-{month:02d}-df{freq}.'
+                                        f'{suffix or loc.BINARY_SUFFIX}')
+        return path
+    monkeypatch.setattr(loc, 'processed_csv', processed('csv'))
+    monkeypatch.setattr(loc, 'processed_binary', processed(None))
+    monkeypatch.setattr(loc, 'vintage_db',
+                        lambda: os.path.join(folder, 'vintages.sqlite'))
+    monkeypatch.setattr(loc, 'pipeline_state',
+                        lambda: os.path.join(folder, 'pipeline.json'))
+    monkeypatch.setattr(kep.runner, 'CACHE', ParseCache(folder))
+    monkeypatch.setattr(kep.runner, 'interim_index', lambda year, month:
+                        os.path.join(folder, f'{year}-{month:02d}.index'))
+    return folder
@@ -0,0 +1,12 @@
+from kep.benchmark import run, compare, STAGES
+
+
+def test_run_and_compare():
+    result = run(dates=[(2018, 6)], repeat=1)
+    assert list(result['stages']) == STAGES
+    assert list(result['months']) == ['2018-06']
+    assert result['meta']['dates'] == ['2018-06']
+    assert compare(result, result) == []
+    slow = {'stages': {stage: {'best': t['best'] * 2}
+                       for stage, t in result['stages'].items()}}
+    assert compare(result, slow) == STAGES
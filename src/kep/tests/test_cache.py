@@ -0,0 +1,70 @@
+import os
+import tempfile
+
+from kep.cache import ParseCache, encode, decode
+from kep.engine.row import Datapoint
+
+DATAPOINTS = [
+    Datapoint(label='INDPRO_yoy', freq='a', year=2015, month=12, value=99.2),
+    Datapoint(label='INDPRO_rog', freq='q', year=2015, month=3, value=82.8),
+    Datapoint(label='INDPRO_yoy', freq='m', year=2015, month=1, value=100.0)]
+LABELS = [('INDPRO', 'yoy'), ('INDPRO', 'rog')]
+
+
+def test_encode_decode_roundtrip():
+    frame, labels = decode(encode(DATAPOINTS, LABELS))
+    assert list(frame) == DATAPOINTS
+    assert labels == LABELS
+
+
+def test_ParseCache_get_and_put():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ParseCache(folder)
+        assert cache.get('abc') is None
+        cache.put('abc', DATAPOINTS, LABELS)
+        frame, labels = cache.get('abc')
+        assert list(frame) == DATAPOINTS
+        assert labels == LABELS
+
+
+def test_ParseCache_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ParseCache(folder)
+        for i, key in enumerate(['a', 'b', 'c']):
+            cache.put(key, DATAPOINTS, LABELS)
+            os.utime(str(cache.path(key)), (i, i))
+        cache.get('a')
+        size = cache.path('a').stat().st_size
+        cache.max_bytes = 2 * size
+        cache.evict()
+        assert [p.stem for p in cache.files()] == ['c', 'a']
+
+
+def test_ParseCache_evict_skips_files_deleted_by_other_process():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ParseCache(folder)
+        for key in ['a', 'b']:
+            cache.put(key, DATAPOINTS, LABELS)
+        entries = cache.entries()
+        cache.path('a').unlink()
+        cache.entries = lambda: entries
+        cache.max_bytes = 0
+        cache.evict()
+        assert not cache.path('b').exists()
+
+
+def test_ParseCache_files_exclude_temporary_files():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ParseCache(folder)
+        cache.put('abc', DATAPOINTS, LABELS)
+        (cache.folder / 'abc.0123.tmp.bin').write_bytes(b'')
+        assert [p.stem for p in cache.files()] == ['abc']
+
+
+def test_ParseCache_get_unreadable_file_is_a_miss():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ParseCache(folder)
+        cache.put('abc', DATAPOINTS, LABELS)
+        # pickle of unknown protocol version 99
+        cache.path('abc').write_bytes(b'\x80\x63.')
+        assert cache.get('abc') is None
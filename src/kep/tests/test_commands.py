@@ -0,0 +1,84 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+import kep.commands
+from kep.dataframe.columnar import read_columnar
+from kep.vintage import VintageStore
+
+
+def test_write_processed_saves_all_frequencies(tmp_outputs):
+    folder = tmp_outputs
+    loc = kep.commands.loc
+    index = pd.to_datetime(['2017-12-31'])
+    df_dict = {freq: pd.DataFrame({'GDP_yoy': [101.5]}, index=index)
+               for freq in 'aqm'}
+    paths = kep.commands.write_processed(2018, 5, df_dict)
+    assert paths == [loc.processed_csv(2018, 5, freq) for freq in 'aqm']
+    for path in paths:
+        assert pd.read_csv(path, index_col=0).GDP_yoy.tolist() == [101.5]
+    store = VintageStore(loc.vintage_db())
+    assert store.releases() == [(2018, 5)]
+    assert not [x for x in os.listdir(folder) if '.tmp' in x]
+
+
+@pytest.mark.parametrize('suffix', ['feather', 'parquet'])
+def test_save_frame_writes_columnar_file(tmp_outputs, monkeypatch, suffix):
+    pytest.importorskip('pyarrow')
+    loc = kep.commands.loc
+    monkeypatch.setattr(loc, 'BINARY_SUFFIX', suffix)
+    index = pd.to_datetime(['2017-12-31'])
+    df = pd.DataFrame({'GDP_yoy': [101.5]}, index=index)
+    kep.commands.save_frame(df, 2018, 5, 'a')
+    path = loc.processed_binary(2018, 5, 'a')
+    assert path.endswith(suffix)
+    assert read_columnar(path).equals(df)
+    assert sorted(os.listdir(tmp_outputs)) == sorted(
+        ['2018-05-dfa.csv', f'2018-05-dfa.{suffix}'])
+
+
+def test_save_frame_removes_stale_binary_without_pyarrow(tmp_outputs,
+                                                         monkeypatch):
+    loc = kep.commands.loc
+    monkeypatch.setattr(kep.commands.columnar, 'available', lambda: False)
+    stale = loc.processed_binary(2018, 5, 'a')
+    with open(stale, 'wb') as f:
+        f.write(b'old')
+    index = pd.to_datetime(['2017-12-31'])
+    df = pd.DataFrame({'GDP_yoy': [101.5]}, index=index)
+    kep.commands.save_frame(df, 2018, 5, 'a')
+    assert os.listdir(tmp_outputs) == ['2018-05-dfa.csv']
+
+
+def test_import_kep_does_not_load_pandas():
+    code = ('import sys, kep; '
+            'assert callable(kep.save_all); '
+            'assert "pandas" not in sys.modules')
+    folder = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    subprocess.check_call([sys.executable, '-c', code], cwd=folder)
+
+
+def test_rebuild_one_saves_processed_files(tmp_outputs):
+    assert kep.commands.rebuild_one(2018, 6) == 'Saved 2018-6 dataframes'
+    df = pd.read_csv(kep.commands.loc.processed_csv(2018, 6, 'm'),
+                     index_col=0)
+    assert not df.empty
+    assert VintageStore(kep.commands.loc.vintage_db()).releases() == \
+        [(2018, 6)]
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason='worker process must see patched locations')
+def test_rebuild_continues_after_failed_month(tmp_outputs):
+    # 2013-08 has a value that cannot be converted to float
+    failures = kep.commands.rebuild('2013-07', '2013-09', workers=2)
+    assert list(failures) == [(2013, 8)]
+    assert 'ValueError' in failures[(2013, 8)]
+    for month in (7, 9):
+        path = kep.commands.loc.processed_csv(2013, month, 'a')
+        assert not pd.read_csv(path, index_col=0).empty
+    assert not os.path.exists(kep.commands.loc.processed_csv(2013, 8, 'a'))
@@ -1,7 +1,10 @@
+import pathlib
+
 from kep.utilities.tempfile import TempFile
 
+import kep.parameters
 from kep.parameters import (load_yaml_list, load_yaml_one_document,
-                            ParsingParameters, CheckParameters)
+                            load_compiled, ParsingParameters, CheckParameters)
 
 
 TEXT_1 = '- 123\n---\n- 456'
@@ -33,3 +36,33 @@ def test_CheckParameters():
     assert c.group_dict
     assert c.mandatory_list
     assert c.optional_lists
+
+
+def test_load_compiled_rebuilds_values_on_code_change(tmpdir, monkeypatch):
+    code = pathlib.Path(str(tmpdir), 'code.py')
+    code.write_text('x = 1')
+    monkeypatch.setattr(kep.parameters, 'CODE_FILES', [code])
+    monkeypatch.setattr(kep.parameters, 'compiled_path',
+                        lambda name: pathlib.Path(str(tmpdir), name))
+    builds = []
+
+    def build():
+        builds.append(1)
+        return dict(a=len(builds))
+
+    with TempFile(TEXT_1) as f:
+        assert load_compiled('test', [f], build) == dict(a=1)
+        assert load_compiled('test', [f], build) == dict(a=1)
+        code.write_text('x = 2')
+        assert load_compiled('test', [f], build) == dict(a=2)
+
+
+def test_load_compiled_rebuilds_unreadable_file(tmpdir, monkeypatch):
+    monkeypatch.setattr(kep.parameters, 'compiled_path',
+                        lambda name: pathlib.Path(str(tmpdir), name))
+    # pickle of unknown protocol version 99
+    pathlib.Path(str(tmpdir), 'test').write_bytes(b'\x80\x63.')
+    with TempFile(TEXT_1) as f:
+        assert load_compiled('test', [f], lambda: dict(a=1)) == dict(a=1)
+        assert load_compiled('test', [f], lambda: dict(a=2)) == dict(a=1)
+    assert [p.name for p in pathlib.Path(str(tmpdir)).iterdir()] == ['test']
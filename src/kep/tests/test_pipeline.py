@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+import kep.pipeline as pipeline
+from kep.pipeline import (PipelineState, Pipeline, update_range,
+                          run_until_complete, output_exists, STAGES)
+from kep.load.unpack import DOC_NAMES
+
+
+def process_id(year, month, session=None):
+    return os.getpid()
+
+
+def fake_stages(monkeypatch, tmpdir, fail=None):
+    """Replace stages with functions that record calls and outputs."""
+    calls, outputs = [], set()
+    parsed_first = threading.Event()
+    overlaps = []
+
+    def make(stage):
+        def run(year, month, session=None):
+            if (stage, year, month) == fail:
+                raise IOError('no file')
+            if (stage, year, month) == ('parse', 2018, 1):
+                parsed_first.set()
+            if (stage, year, month) == ('download', 2018, 3):
+                overlaps.append(parsed_first.wait(timeout=5))
+            calls.append((stage, year, month))
+            outputs.add((stage, year, month))
+            return 'ok'
+        return run
+
+    monkeypatch.setattr(pipeline, 'STAGE_FUNCTIONS',
+                        {stage: make(stage) for stage in STAGES})
+    monkeypatch.setattr(pipeline, 'PROCESS_STAGES', set())
+    monkeypatch.setattr(pipeline, 'LIMITS',
+                        dict(download=4, unpack=2, convert=1, parse=2))
+    monkeypatch.setattr(pipeline, 'output_exists',
+                        lambda *key: key in outputs)
+    path = os.path.join(str(tmpdir), 'pipeline.json')
+    monkeypatch.setattr(pipeline.loc, 'pipeline_state', lambda: path)
+    return calls, outputs, overlaps, path
+
+
+def test_update_range_runs_stages_in_order_and_skips_completed(
+        tmpdir, monkeypatch):
+    calls, _, overlaps, path = fake_stages(monkeypatch, tmpdir)
+    assert update_range('2018-01', '2018-03', publish=False) == {}
+    for month in (1, 2, 3):
+        assert [c[0] for c in calls if c[1:] == (2018, month)] == STAGES
+    # month 3 was still downloading when month 1 was parsed
+    assert overlaps == [True]
+    assert set(PipelineState(path).completed(2018, 2)) == set(STAGES)
+    calls.clear()
+    update_range('2018-01', '2018-03', publish=False)
+    assert calls == []
+
+
+def test_failed_stage_stops_only_its_month(tmpdir, monkeypatch):
+    calls, outputs, _, path = fake_stages(
+        monkeypatch, tmpdir, fail=('unpack', 2018, 2))
+    failures = update_range('2018-01', '2018-03', publish=False)
+    assert list(failures) == [(2018, 2)]
+    assert failures[(2018, 2)].startswith('unpack: OSError')
+    assert ('parse', 2018, 3) in calls
+    assert list(PipelineState(path).completed(2018, 2)) == ['download']
+
+
+def test_PipelineState_continues_after_existing_output(tmpdir, monkeypatch):
+    _, outputs, _, path = fake_stages(monkeypatch, tmpdir)
+    state = PipelineState(path)
+    # release not in state file, interim CSV file exists
+    outputs.add(('convert', 2015, 4))
+    assert state.todo(2015, 4) == ['parse']
+    state.mark(2015, 4, 'parse')
+    assert list(state.completed(2015, 4)) == STAGES
+    assert PipelineState(path).todo(2015, 4) == ['parse']
+
+
+def test_parse_stage_runs_in_process_pool(tmpdir, monkeypatch):
+    calls, _, _, path = fake_stages(monkeypatch, tmpdir)
+    monkeypatch.setattr(pipeline, 'PROCESS_STAGES', {'parse'})
+    monkeypatch.setattr(pipeline, 'STAGE_FUNCTIONS',
+                        dict(pipeline.STAGE_FUNCTIONS, parse=process_id))
+    p = Pipeline(PipelineState(path), workers=1)
+
+    async def run():
+        result = await p.run([(2018, 1), (2018, 2)])
+        pid = await p.run_stage('parse', 2018, 3)
+        return result, pid
+
+    try:
+        result, pid = run_until_complete(run())
+    finally:
+        p.close()
+    assert result == {(2018, 1): True, (2018, 2): True}
+    assert pid != os.getpid()
+    assert 'parse' in PipelineState(path).completed(2018, 2)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason='worker process must see patched locations')
+def test_real_parse_stage_in_process_pool(tmp_outputs):
+    loc = pipeline.loc
+    update_range('2018-06', '2018-06', workers=1, publish=False)
+    assert PipelineState(loc.pipeline_state()).todo(2018, 6) == []
+    df = pd.read_csv(loc.processed_csv(2018, 6, 'a'), index_col=0)
+    assert not df.empty
+
+
+def test_unpack_output_requires_all_tab_files(tmpdir, monkeypatch):
+    monkeypatch.setattr(pipeline.loc, 'raw_folder',
+                        lambda year, month: str(tmpdir))
+    # interrupted extraction left some of the files
+    for name in DOC_NAMES[:2]:
+        (tmpdir / name).write_binary(b'')
+    assert not output_exists('unpack', 2018, 6)
+    for name in DOC_NAMES[2:]:
+        (tmpdir / name).write_binary(b'')
+    assert output_exists('unpack', 2018, 6)
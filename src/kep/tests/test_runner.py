@@ -1,9 +1,50 @@
-from kep.runner import random_date, get_dataframes
+from copy import deepcopy
 
+from kep.runner import (random_date, get_dataframes,
+                        extract_tables, extract_tables_many, ReparseSession)
+from kep.engine import datapoints, parse_tables, read_tables
+from kep.parameters import ParsingParameters
+from kep.utilities.locations import interim_csv
 
-def test_randomised_import():
+
+def test_randomised_import(tmp_outputs):
     year, month = random_date()
     dfa, dfq, dfm = get_dataframes(year, month)
     assert not dfa.empty
     assert not dfq.empty
     assert not dfm.empty
+
+
+def summary(tables):
+    return [(t.label, t.row_format, t.datarows) for t in tables]
+
+
+def test_extract_tables_many_same_as_extract_tables(tmp_outputs):
+    dates = [(2016, 12), (2018, 6)]
+    result = extract_tables_many(dates)
+    for year, month in dates:
+        expected = extract_tables(year, month)
+        assert summary(result[(year, month)]) == summary(expected)
+        # no references to memory-mapped CSV file are kept
+        assert all(t._datarow_strings is None
+                   for t in result[(year, month)])
+
+
+def test_ReparseSession_reparses_only_tables_of_edited_document():
+    p = ParsingParameters
+    session = ReparseSession([(2018, 6)])
+    reparser = session.reparsers[(2018, 6)]
+    n = len(session.labels[(2018, 6)])
+    # rename one variable in first segment document, like edit of YAML file
+    segment_dicts = deepcopy(p.segment_dicts)
+    command = segment_dicts[0]['commands'][-1]
+    assert command['name'] == 'CPI_ALCOHOL'
+    command['name'] = 'CPI_ALC'
+    affected = session.update(p.common_dicts, segment_dicts)
+    assert {'CPI_ALCOHOL_rog', 'CPI_ALC_rog'} <= affected
+    assert all(label.startswith('CPI') for label in affected)
+    # one table emits datapoints again, others are reused
+    assert reparser.reused == n - 1
+    tables = parse_tables(read_tables(interim_csv(2018, 6)),
+                          p.common_dicts, segment_dicts, p.units_dict)
+    assert sorted(session.datapoints(2018, 6)) == sorted(datapoints(tables))
@@ -0,0 +1,50 @@
+import os
+import tempfile
+
+import pandas as pd
+import pytest
+
+from kep.vintage import VintageStore
+
+
+def make_df(values):
+    index = pd.to_datetime(['2015-03-31', '2015-06-30'])
+    return pd.DataFrame({'year': [2015, 2015],
+                         'qtr': [1, 2],
+                         'GDP_yoy': values},
+                        index=index)
+
+
+@pytest.fixture
+def store():
+    with tempfile.TemporaryDirectory() as folder:
+        yield VintageStore(os.path.join(folder, 'vintages.sqlite'))
+
+
+def test_append_and_snapshot(store):
+    assert store.append(2015, 8, {'q': make_df([97.8, None])}) == 1
+    assert store.append(2015, 9, {'q': make_df([97.9, 95.4])}) == 2
+    df = store.snapshot(2015, 9, 'q')
+    assert df.columns.tolist() == ['GDP_yoy']
+    assert df.GDP_yoy.tolist() == [97.9, 95.4]
+    assert store.releases() == [(2015, 8), (2015, 9)]
+
+
+def test_append_replaces_release(store):
+    store.append(2015, 9, {'q': make_df([97.8, 95.4])})
+    store.append(2015, 9, {'q': make_df([97.9, 95.5])})
+    assert store.snapshot(2015, 9, 'q').GDP_yoy.tolist() == [97.9, 95.5]
+
+
+def test_history(store):
+    store.append(2015, 8, {'q': make_df([97.8, None])})
+    store.append(2015, 9, {'q': make_df([97.9, 95.4])})
+    df = store.history('GDP_yoy', 'q', start='2015-04', end='2015')
+    assert df.columns.tolist() == ['2015-09']
+    assert df.index.tolist() == [pd.Timestamp('2015-06-30')]
+    df = store.history('GDP_yoy', 'q')
+    assert df.loc['2015-03-31'].tolist() == [97.8, 97.9]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
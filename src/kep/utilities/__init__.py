@@ -1 +1 @@
-from .tempfile import TempFile
+from .tempfile import TempFile, atomic_path
@@ -1,5 +1,28 @@
+from datetime import date
 import random
-import pandas as pd
+
+
+def parse_month(date_string: str):
+    """Convert string like '2009-04' to (2009, 4) tuple."""
+    year, month = date_string.split('-')[:2]
+    return int(year), int(month)
+
+
+def month_range(start: tuple, end: tuple):
+    """List of (year, month) tuples from *start* to *end* inclusive."""
+    year, month = start
+    result = []
+    while (year, month) <= end:
+        result.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return result
+
+
+def previous_month(today=None):
+    today = today or date.today()
+    if today.month == 1:
+        return today.year - 1, 12
+    return today.year, today.month - 1
 
 
 def supported_dates(start_date='2009-04', exclude_dates=['2013-11']):
@@ -9,10 +32,9 @@ def supported_dates(start_date='2009-04', exclude_dates=['2013-11']):
     Returns:
         List of (year: int, month: int) tuples.
     """
-    end_date = pd.to_datetime('today') - pd.offsets.MonthEnd()
-    dates = pd.date_range(start_date, end_date, freq='MS')
-    exclude = map(pd.to_datetime, exclude_dates)
-    return [(date.year, date.month) for date in dates.drop(exclude)]
+    exclude = [parse_month(x) for x in exclude_dates]
+    return [d for d in month_range(parse_month(start_date), previous_month())
+            if d not in exclude]
 
 
 SUPPORTED_DATES = supported_dates()
@@ -29,9 +51,9 @@ def assert_supported(year, month):
 
 def date_span(start_date, end_date):
     supported_date_list = supported_dates()
-    return [(date.year, date.month) for date in
-            pd.date_range(start_date, end_date, freq='MS')
-            if (date.year, date.month) in supported_date_list]
+    return [d for d in month_range(parse_month(start_date),
+                                   parse_month(end_date))
+            if d in supported_date_list]
 
 
 def is_latest(year: int, month: int, offset=2):
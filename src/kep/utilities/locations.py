@@ -34,6 +34,18 @@ def latest_folder(data_root=DATA_ROOT):
     return data_root / 'processed' / 'latest'
 
 
+def cache_folder(data_root=DATA_ROOT):
+    return data_root / 'cache'
+
+
+def vintage_db(data_root=DATA_ROOT):
+    return data_root / 'processed' / 'vintages.sqlite'
+
+
+def pipeline_state(data_root=DATA_ROOT):
+    return data_root / 'processed' / 'pipeline.json'
+
+
 @as_string
 def xl_location():
     return OUTPUT_ROOT / 'kep.xlsx'
@@ -69,8 +81,16 @@ def interim_csv(year: int, month: int, data_root=DATA_ROOT):
     return inner_folder(data_root, 'interim', year, month) / 'tab.csv'
 
 
-def filename(freq):
-    return 'df{}.csv'.format(freq)
+@as_string
+def interim_index(year: int, month: int, data_root=DATA_ROOT):
+    return inner_folder(data_root, 'interim', year, month) / 'tab.index'
+
+
+BINARY_SUFFIX = 'feather'
+
+
+def filename(freq, suffix='csv'):
+    return 'df{}.{}'.format(freq, suffix)
 
 
 @as_string
@@ -81,3 +101,14 @@ def processed_csv(year, month, freq: str, data_root=DATA_ROOT):
 @as_string
 def latest_csv(freq: str, data_root=DATA_ROOT):
     return latest_folder(data_root) / filename(freq)
+
+
+@as_string
+def processed_binary(year, month, freq: str, data_root=DATA_ROOT):
+    return (inner_folder(data_root, 'processed', year, month) /
+            filename(freq, BINARY_SUFFIX))
+
+
+@as_string
+def latest_binary(freq: str, data_root=DATA_ROOT):
+    return latest_folder(data_root) / filename(freq, BINARY_SUFFIX)
@@ -0,0 +1,160 @@
+"""Opt-in timers and counters for the parsing pipeline.
+
+Usage:
+    with metrics.collect() as m:
+        kep.get_dataframes(2018, 6)
+    m.to_jsonl('metrics.jsonl')
+    m.to_prometheus('metrics.prom')
+
+Outside of collect() block timer() and count() do nothing.
+"""
+from contextlib import contextmanager
+import json
+import time
+
+from kep.utilities.tempfile import atomic_path
+
+__all__ = ['collect', 'enabled', 'timer', 'count', 'labels', 'Metrics']
+
+PREFIX = 'kep_'
+
+
+def key(name: str, label_dict: dict):
+    return name, tuple(sorted(label_dict.items()))
+
+
+class Metrics:
+    """Counters and timers keyed by name and labels.
+
+    Attributes:
+        counters - {(name, labels): value}
+        timers - {(name, labels): [count, total seconds, max seconds]}
+        context - labels added to every record, see labels()
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.timers = {}
+        self.context = {}
+
+    def count(self, name: str, n=1, **label_dict):
+        k = key(name, {**self.context, **label_dict})
+        self.counters[k] = self.counters.get(k, 0) + n
+
+    def add_time(self, name: str, seconds: float, **label_dict):
+        k = key(name, {**self.context, **label_dict})
+        t = self.timers.setdefault(k, [0, 0.0, 0.0])
+        t[0] += 1
+        t[1] += seconds
+        t[2] = max(t[2], seconds)
+
+    @contextmanager
+    def timer(self, name: str, **label_dict):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start, **label_dict)
+
+    def records(self):
+        """List of dictionaries, one per counter or timer."""
+        result = []
+        for (name, label_items), value in self.counters.items():
+            result.append(dict(type='counter', name=name,
+                               labels=dict(label_items), value=value))
+        for (name, label_items), (n, total, longest) in self.timers.items():
+            result.append(dict(type='timer', name=name,
+                               labels=dict(label_items),
+                               count=n, total=total, max=longest))
+        return result
+
+    def to_jsonl(self, path: str):
+        """Append records to JSON lines file at *path*."""
+        with open(path, 'a', encoding='utf-8') as f:
+            for record in self.records():
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def to_prometheus(self, path: str):
+        """Write records to *path* in Prometheus text format."""
+        with atomic_path(path) as tmp:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(prometheus_text(self))
+
+
+def format_labels(label_items) -> str:
+    if not label_items:
+        return ''
+    escaped = [(k, str(v).replace('\\', r'\\').replace('"', r'\"'))
+               for k, v in label_items]
+    return '{' + ','.join(f'{k}="{v}"' for k, v in escaped) + '}'
+
+
+def prometheus_text(m: Metrics) -> str:
+    lines = []
+    for name in sorted(set(name for name, _ in m.counters)):
+        metric = PREFIX + name + '_total'
+        lines.append(f'# TYPE {metric} counter')
+        for (n, label_items), value in m.counters.items():
+            if n == name:
+                lines.append(f'{metric}{format_labels(label_items)} {value}')
+    for name in sorted(set(name for name, _ in m.timers)):
+        metric = PREFIX + name + '_seconds'
+        lines.append(f'# TYPE {metric} summary')
+        for (n, label_items), (count, total, _) in m.timers.items():
+            if n == name:
+                labels_text = format_labels(label_items)
+                lines.append(f'{metric}_sum{labels_text} {total}')
+                lines.append(f'{metric}_count{labels_text} {count}')
+    return '\n'.join(lines) + '\n'
+
+# -----------------------------------------------------------------------------
+
+
+_current = None
+
+
+@contextmanager
+def collect():
+    """Collect metrics in the block, yield Metrics instance."""
+    global _current
+    previous, _current = _current, Metrics()
+    try:
+        yield _current
+    finally:
+        _current = previous
+
+
+@contextmanager
+def noop():
+    yield
+
+
+def enabled() -> bool:
+    return _current is not None
+
+
+def timer(name: str, **label_dict):
+    """Context manager to time a block as *name*."""
+    if _current is None:
+        return noop()
+    return _current.timer(name, **label_dict)
+
+
+def count(name: str, n=1, **label_dict):
+    if _current is not None:
+        _current.count(name, n, **label_dict)
+
+
+@contextmanager
+def labels(**label_dict):
+    """Add *label_dict* to all metrics recorded in the block."""
+    if _current is None:
+        yield
+        return
+    m = _current
+    previous = m.context
+    m.context = {**previous, **label_dict}
+    try:
+        yield
+    finally:
+        m.context = previous
@@ -1,8 +1,8 @@
 """Display parsing result description."""
 
-from kep.engine.parser import names, labels
+from kep.engine.parser import labels
 
-__all__ = ['print_reference']
+__all__ = ['print_reference', 'print_labels']
 
 
 def underscore(label: tuple):
@@ -19,9 +19,17 @@ def with_comma(items):
     return ", ".join(items)
 
 
-def cover(tables, group_dict):
+def label_names(label_list):
+    res = []
+    for name, _ in label_list:
+        if name not in res:
+            res.append(name)
+    return res
+
+
+def cover(label_list, group_dict):
     in_yaml = all_names(group_dict)
-    in_tables = names(tables)
+    in_tables = label_names(label_list)
     return (set(in_yaml) - set(in_tables) or '',
             set(in_tables) - set(in_yaml) or '')
 
@@ -31,8 +39,16 @@ def all_names(group_dict):
 
 
 def print_reference(tables, group_dict):
-    name_list = names(tables)
-    label_list = labels(tables)
+    print_labels(labels(tables), group_dict)
+
+
+def print_labels(label_list, group_dict):
+    """Print variables found in *label_list* by groups in *group_dict*.
+
+       Args:
+           label_list - list of (name, unit) tuples
+    """
+    name_list = label_names(label_list)
     print(len(name_list), "variables and", len(label_list), "labels")
     for group_header, group_names in group_dict.items():
         print(group_header)
@@ -40,7 +56,7 @@ def print_reference(tables, group_dict):
             if name in name_list:
                 msg = with_comma(filtered_labels(label_list, name))
                 print("    {} ({})".format(name, msg))
-    missing, extras = cover(tables, group_dict)
+    missing, extras = cover(label_list, group_dict)
     missing = sorted(list(missing))
     br = "\n    "
     if extras:
@@ -1,7 +1,9 @@
 """Helper functions."""
+from contextlib import contextmanager
 import pathlib
 import tempfile
 import os
+import uuid
 
 
 class TempFile():
@@ -23,3 +25,21 @@ def exists(filename):
         return os.path.exists(filename)
     except ValueError:
         return False
+
+
+@contextmanager
+def atomic_path(path):
+    """Yield temporary filename in same folder as *path*.
+       Temporary file is renamed to *path* if block exits without error,
+       so that readers never see a partially written file.
+    """
+    # unique name, file gets default permissions unlike tempfile.mkstemp(),
+    # suffix is kept for writers that choose format by file extension
+    root, ext = os.path.splitext(str(path))
+    tmp = '{}.{}.tmp{}'.format(root, uuid.uuid4().hex, ext)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
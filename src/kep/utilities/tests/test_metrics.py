@@ -0,0 +1,51 @@
+import json
+
+import kep.utilities.metrics as metrics
+from kep.engine.reader import HeaderMatcher
+
+
+def test_count_and_timer_do_nothing_when_not_collecting():
+    assert not metrics.enabled()
+    metrics.count('tables_seen', 5)
+    with metrics.timer('stage', stage='validate'):
+        pass
+
+
+def test_collect_with_labels():
+    with metrics.collect() as m:
+        with metrics.labels(month='2018-06'):
+            metrics.count('tables_seen', 5)
+            metrics.count('tables_seen', 2)
+            with metrics.timer('stage', stage='validate'):
+                pass
+    assert not metrics.enabled()
+    counters = {(r['name'], r['labels']['month']): r['value']
+                for r in m.records() if r['type'] == 'counter'}
+    assert counters == {('tables_seen', '2018-06'): 7}
+    timer, = [r for r in m.records() if r['type'] == 'timer']
+    assert timer['labels'] == {'month': '2018-06', 'stage': 'validate'}
+    assert timer['count'] == 1
+
+
+def test_regex_evaluations_are_counted():
+    matcher = HeaderMatcher(['Индекс цен', 'Экспорт'])
+    with metrics.collect() as m:
+        matcher.hits(['Индекс цен на товары'])
+    assert m.records()[0]['value'] == 1
+
+
+def test_export(tmpdir):
+    with metrics.collect() as m:
+        metrics.count('datapoints_emitted', 10, month='2018-06')
+        with metrics.timer('stage', stage='parse_units'):
+            pass
+    path = str(tmpdir / 'metrics.jsonl')
+    m.to_jsonl(path)
+    m.to_jsonl(path)
+    with open(path) as f:
+        assert len([json.loads(line) for line in f]) == 4
+    path = str(tmpdir / 'metrics.prom')
+    m.to_prometheus(path)
+    text = open(path).read()
+    assert 'kep_datapoints_emitted_total{month="2018-06"} 10\n' in text
+    assert 'kep_stage_seconds_count{stage="parse_units"} 1\n' in text
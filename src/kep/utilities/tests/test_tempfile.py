@@ -1,8 +1,40 @@
+import os
 import pathlib
-from kep.utilities import TempFile
+import tempfile
+
+import pytest
+
+from kep.utilities import TempFile, atomic_path
 
 
 def test_TempFile():
     text = 'конь-огонь'
     with TempFile(text) as filename:
         assert text == pathlib.Path(filename).read_text(encoding='utf-8')
+
+
+def test_atomic_path_renames_on_success():
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'a.txt')
+        with atomic_path(path) as tmp:
+            pathlib.Path(tmp).write_text('abc')
+            assert not os.path.exists(path)
+        assert pathlib.Path(path).read_text() == 'abc'
+        assert os.listdir(folder) == ['a.txt']
+
+
+def test_atomic_path_keeps_suffix():
+    with tempfile.TemporaryDirectory() as folder:
+        with atomic_path(os.path.join(folder, 'dfa.feather')) as tmp:
+            assert tmp.endswith('.feather')
+            pathlib.Path(tmp).write_text('abc')
+
+
+def test_atomic_path_leaves_nothing_on_error():
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'a.txt')
+        with pytest.raises(ZeroDivisionError):
+            with atomic_path(path) as tmp:
+                pathlib.Path(tmp).write_text('abc')
+                1 / 0
+        assert os.listdir(folder) == []
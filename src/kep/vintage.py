@@ -0,0 +1,151 @@
+"""Vintage store: processed dataframes of all releases in one SQLite file.
+
+Each value is keyed by release (year and month of publication), label,
+frequency and date. Primary key order serves per-release snapshots,
+a second index on (label, freq, date) serves revision histories of
+a time series across releases.
+"""
+from contextlib import closing
+import sqlite3
+
+import pandas as pd
+
+__all__ = ['VintageStore', 'release_tag']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vintages (
+    release_year INTEGER NOT NULL,
+    release_month INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    freq TEXT NOT NULL,
+    date TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (release_year, release_month, freq, label, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS series_history
+    ON vintages (label, freq, date, release_year, release_month);
+"""
+
+# columns of processed dataframes that are not time series
+DATE_COLUMNS = ('year', 'qtr', 'month')
+
+
+def release_tag(year: int, month: int) -> str:
+    return f'{year}-{month:02d}'
+
+
+def to_rows(df) -> list:
+    """Convert wide dataframe *df* to list of (label, date, value)
+       tuples, skipping empty values."""
+    dates = df.index.strftime('%Y-%m-%d').tolist()
+    rows = []
+    for label in df.columns:
+        if label in DATE_COLUMNS:
+            continue
+        values = df[label].tolist()
+        rows.extend((label, date, value)
+                    for date, value in zip(dates, values)
+                    if value == value)  # skip NaN
+    return rows
+
+
+def pivot(rows, columns: str):
+    """Make dataframe from *rows* of (date, column, value),
+       indexed by date."""
+    df = pd.DataFrame(rows, columns=['date', columns, 'value'])
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.pivot(index='date', columns=columns, values='value')
+    df.index.name = None
+    df.columns.name = None
+    return df
+
+
+class VintageStore:
+    """SQLite file with datapoints of all releases.
+
+    Usage:
+        store = VintageStore('vintages.sqlite')
+        store.append(2017, 5, {'a': dfa, 'q': dfq, 'm': dfm})
+        store.snapshot(2017, 5, 'q')
+        store.history('GDP_yoy', 'a', start='2015', end='2015')
+    """
+
+    def __init__(self, path, timeout=60):
+        self.path = str(path)
+        self.timeout = timeout
+
+    def connect(self):
+        con = sqlite3.connect(self.path, timeout=self.timeout)
+        con.executescript(SCHEMA)
+        return con
+
+    def query(self, sql: str, params=()):
+        with closing(self.connect()) as con:
+            return con.execute(sql, params).fetchall()
+
+    def append(self, year: int, month: int, df_dict: dict):
+        """Save dataframes from *df_dict* like {'a': dfa, ...} as release
+           *year*, *month*. Replaces previous content of this release.
+
+           Returns:
+              number of values written
+        """
+        count = 0
+        with closing(self.connect()) as con, con:
+            con.execute('DELETE FROM vintages '
+                        'WHERE release_year = ? AND release_month = ?',
+                        (year, month))
+            for freq, df in df_dict.items():
+                rows = [(year, month, label, freq, date, value)
+                        for label, date, value in to_rows(df)]
+                con.executemany('INSERT INTO vintages VALUES (?, ?, ?, ?, ?, ?)',
+                                rows)
+                count += len(rows)
+        return count
+
+    def releases(self) -> list:
+        """List of (year, month) tuples of stored releases."""
+        return self.query('SELECT DISTINCT release_year, release_month '
+                          'FROM vintages ORDER BY 1, 2')
+
+    def labels(self, freq: str) -> list:
+        rows = self.query('SELECT DISTINCT label FROM vintages '
+                          'WHERE freq = ? ORDER BY 1', (freq,))
+        return [label for label, in rows]
+
+    def snapshot(self, year: int, month: int, freq: str, labels=None):
+        """Dataframe with time series as published in release *year*,
+           *month*. Read only *labels*, if given.
+        """
+        sql = ('SELECT date, label, value FROM vintages '
+               'WHERE release_year = ? AND release_month = ? AND freq = ?')
+        params = [year, month, freq]
+        if labels is not None:
+            labels = list(labels)
+            sql += ' AND label IN ({})'.format(', '.join('?' * len(labels)))
+            params.extend(labels)
+        return pivot(self.query(sql, params), 'label')
+
+    def history(self, label: str, freq: str, start=None, end=None):
+        """Revisions of time series *label* at frequency *freq*.
+
+           Args:
+              start, end - optional date bounds like '2015' or '2015-06'
+
+           Returns:
+              dataframe indexed by date, one column per release
+              like '2017-05'
+        """
+        sql = ('SELECT date, release_year, release_month, value '
+               'FROM vintages WHERE label = ? AND freq = ?')
+        params = [label, freq]
+        if start is not None:
+            sql += ' AND date >= ?'
+            params.append(str(start))
+        if end is not None:
+            # '2015' must include '2015-12-31'
+            sql += ' AND date <= ?'
+            params.append(str(end) + '~')
+        rows = [(date, release_tag(year, month), value)
+                for date, year, month, value in self.query(sql, params)]
+        return pivot(rows, 'release')
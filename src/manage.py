@@ -2,21 +2,13 @@ import kep
 
 
 def run(year, month):
-    # unpack: if file exists, do not download
-    kep.download(year, month)
-    # unpack: if word files exist, do not unpack
-    kep.unpack(year, month)
-    # rename: to_word
-    kep.convert(year, month)
-    kep.save_processed(year, month)
-    kep.to_latest(year, month)
-    kep.to_excel(year, month)
+    # download, unpack, convert and save, completed stages are skipped
+    kep.update(year, month)
 
 
 def save(year, month):
-    kep.save_processed(year, month)
-    kep.to_latest(year, month)
-    kep.to_excel(year, month)
+    # parse once for processed, latest and Excel files
+    kep.save_all(year, month)
 
 
 if __name__ == '__main__':
@@ -7,7 +7,7 @@ from os import environ
 from pathlib import Path
 
 
-from invoke import Collection, task
+from invoke import Collection, Exit, task
 
 
 PROJECT_DIR = Path(__file__).parent
@@ -113,6 +113,21 @@ def test(ctx):
     ctx.run("py.test src")
 
 
+@task
+def bench(ctx, output='', compare=''):
+    """Time parsing stages, optionally save and compare JSON results"""
+    args = ''
+    if output:
+        args += f' --output {output}'
+    if compare:
+        args += f' --compare {compare}'
+    with PathContext():
+        import kep.benchmark
+        code = kep.benchmark.main(args.split())
+    if code:
+        raise Exit(code=code)
+
+
 @task
 def cov(ctx):
     ctx.run("py.test src -cov=src")
@@ -152,7 +167,7 @@ class PathContext():
 ns = Collection()
 for t in [ls, clean,
           pep8, lint,
-          test, cov,
+          test, cov, bench,
           man, make_html, rst,
           find,
           add]: